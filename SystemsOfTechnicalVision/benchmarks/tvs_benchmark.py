@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+"""Benchmark of vision systems of shipped settings on synthetic images under different executors
+
+Run from the TVS directory: python3 -m benchmarks.tvs_benchmark [--save-baseline] [--baseline path]
+
+Every run of a case (settings, corpus, executor) is a separate process, so peak RSS is measured per run.
+Cases are repeated: throughput and peak RSS are medians of runs, latencies of all runs are pooled.
+Corpora are generated deterministically (the same seed gives the same images) and kept between runs.
+Results are compared with baseline, regressions beyond tolerance and missing baseline fail the run.
+p99 latency is compared only if both results have at least MIN_P99_SAMPLES_COUNT latencies,
+its growth by P99_JITTER_MS is allowed in addition to tolerance.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+from tvs import SERIAL_EXECUTOR, THREAD_EXECUTOR, PROCESS_EXECUTOR
+from tvs_startup import load_settings, create_system
+
+
+SETTINGS_FILES = (
+    "settings.json",
+    "lumbers_volume_detection.json",
+    "barcodes_detection_settings.json",
+    "face_detection_settings.json",
+    "plate_numbers_detection_settings.json")
+EXECUTORS = (SERIAL_EXECUTOR, THREAD_EXECUTOR, PROCESS_EXECUTOR)
+# Corpora as (width, height, images count)
+CORPORA = ((640, 480, 32), (1920, 1080, 16), (3840, 2160, 4))
+DEFAULT_TOLERANCE = 0.15
+DEFAULT_REPEATS_COUNT = 5
+# p99 of fewer latencies is decided by one or two slow images
+MIN_P99_SAMPLES_COUNT = 100
+# Scheduling jitter of the machine, p99 of fast images grows by it without any regression
+P99_JITTER_MS = 1.0
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "tvs_benchmark_baseline.json")
+CORPORA_DIRECTORY_PATH = os.path.join(tempfile.gettempdir(), "tvs_benchmark_corpora")
+CORPUS_SEED = 2024
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark of the System of technical vision.")
+    parser.add_argument("--settings", type=str, nargs="+", default=list(SETTINGS_FILES))
+    parser.add_argument("--executors", type=str, nargs="+", default=list(EXECUTORS))
+    parser.add_argument(
+        "--corpora",
+        type=str,
+        nargs="+",
+        help="Corpora as WIDTHxHEIGHTxCOUNT (e.g. 640x480x32)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Stores results as the new baseline")
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=DEFAULT_REPEATS_COUNT,
+        help="Count of runs of every case")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative loss of throughput and growth of p99 latency and peak RSS")
+    parser.add_argument("--run-case", type=str, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def _parse_corpus(corpus):
+    width, height, images_count = (int(value) for value in corpus.lower().split("x"))
+    return width, height, images_count
+
+
+def _synthetic_image(random_generator, width, height):
+    # Scene has objects of all shipped tasks: bright round ends of lumbers, barcode stripes,
+    # face-like ellipses with dark eyes and plate-like rectangles with characters on noisy gradient
+    gradient = np.linspace(40, 160, width, dtype=np.float32)
+    image = np.repeat(np.tile(gradient, (height, 1))[:, :, np.newaxis], 3, axis=2)
+    image += random_generator.normal(0, 12, image.shape).astype(np.float32)
+    image = np.clip(image, 0, 255).astype(np.uint8)
+    unit = max(min(width, height) // 24, 4)
+
+    for _ in range(int(random_generator.integers(8, 24))):
+        center = (int(random_generator.integers(0, width)), int(random_generator.integers(0, height)))
+        radius = int(random_generator.integers(unit // 2, unit * 2))
+        cv2.circle(image, center, radius, (200, 220, 235), -1)
+        cv2.circle(image, center, radius, (60, 80, 90), max(unit // 8, 1))
+
+    x, y = int(random_generator.integers(0, width - unit * 8)), int(random_generator.integers(0, height - unit * 4))
+    for stripe_index in range(int(random_generator.integers(20, 40))):
+        stripe_width = int(random_generator.integers(1, max(unit // 6, 2) + 1))
+        stripe_x = x + stripe_index * max(unit // 5, 2)
+        cv2.rectangle(image, (stripe_x, y), (stripe_x + stripe_width, y + unit * 3), (0, 0, 0), -1)
+
+    for _ in range(int(random_generator.integers(1, 5))):
+        center = (int(random_generator.integers(unit * 2, width - unit * 2)),
+                  int(random_generator.integers(unit * 3, height - unit * 3)))
+        axes = (unit * 2, unit * 3)
+        cv2.ellipse(image, center, axes, 0, 0, 360, (150, 170, 210), -1)
+        for eye_offset in (-unit, unit):
+            cv2.circle(image, (center[0] + eye_offset, center[1] - unit), max(unit // 4, 1), (30, 30, 30), -1)
+        cv2.ellipse(image, (center[0], center[1] + unit), (unit, unit // 2), 0, 0, 180, (40, 40, 90), 2)
+
+    plate_x = int(random_generator.integers(0, width - unit * 6))
+    plate_y = int(random_generator.integers(0, height - unit * 2))
+    cv2.rectangle(image, (plate_x, plate_y), (plate_x + unit * 6, plate_y + unit + unit // 2), (235, 235, 235), -1)
+    cv2.putText(
+        image, "A123BC", (plate_x + unit // 4, plate_y + unit + unit // 4),
+        cv2.FONT_HERSHEY_SIMPLEX, unit / 30, (0, 0, 0), max(unit // 12, 1))
+    return image
+
+
+def _prepare_corpus(width, height, images_count):
+    corpus_directory_path = os.path.join(
+        CORPORA_DIRECTORY_PATH, f"{width}x{height}x{images_count}_{CORPUS_SEED}")
+    if os.path.isdir(corpus_directory_path) and len(os.listdir(corpus_directory_path)) == images_count:
+        return corpus_directory_path
+
+    os.makedirs(corpus_directory_path, exist_ok=True)
+    for image_index in range(images_count):
+        random_generator = np.random.default_rng((CORPUS_SEED, width, height, image_index))
+        image_path = os.path.join(corpus_directory_path, f"image_{image_index:04d}.jpg")
+        cv2.imwrite(image_path, _synthetic_image(random_generator, width, height), [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return corpus_directory_path
+
+
+def _run_case(case):
+    # Paths of settings are based on the TVS directory, results are written to temporary working directory
+    settings = load_settings(case["settings_path"], os.getcwd())
+    settings["common_settings"]["executor"] = case["executor"]
+    settings["common_settings"]["is_intermediate_results_saves"] = False
+
+    with tempfile.TemporaryDirectory() as working_directory_path:
+        metrics_path = os.path.join(working_directory_path, "metrics.jsonl")
+        settings["common_settings"]["metrics"] = {"stream_path": metrics_path}
+        os.makedirs(os.path.join(working_directory_path, "data", "images", "results"))
+        os.chdir(working_directory_path)
+
+        technical_vision_system = create_system([settings], [case["corpus_path"]])
+        started_time = time.monotonic()
+        technical_vision_system.start_processing()
+        duration = time.monotonic() - started_time
+
+        with open(metrics_path) as metrics_file:
+            events = [json.loads(line) for line in metrics_file]
+
+    latencies = [event["timings"]["image"] for event in events if event["event"] == "image"]
+    # Peak RSS of the main process and of the largest worker process (kilobytes on Linux)
+    peak_rss_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {
+        "latencies": latencies,
+        "images_per_second": len(latencies) / duration if duration > 0 else 0.0,
+        "peak_rss_mb": peak_rss_kb / 1024
+    }
+
+
+def _run_case_repeatedly(case, repeats_count):
+    # Returns None if any run failed (its error is printed by the case process)
+    runs = []
+    for _ in range(repeats_count):
+        completed_process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.tvs_benchmark", "--run-case", json.dumps(case)],
+            stdout=subprocess.PIPE,
+            universal_newlines=True)
+        if completed_process.returncode != 0:
+            return None
+        runs.append(json.loads(completed_process.stdout.splitlines()[-1]))
+
+    latencies = [latency for run in runs for latency in run["latencies"]]
+    return {
+        "images_count": len(latencies),
+        "images_per_second": float(np.median([run["images_per_second"] for run in runs])),
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000 if latencies else 0.0,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000 if latencies else 0.0,
+        "peak_rss_mb": float(np.median([run["peak_rss_mb"] for run in runs]))
+    }
+
+
+def _find_regressions(result, baseline_result, tolerance):
+    regressions = []
+    if result["images_per_second"] < baseline_result["images_per_second"] * (1 - tolerance):
+        regressions.append("throughput")
+    is_p99_comparable = min(result["images_count"], baseline_result["images_count"]) >= MIN_P99_SAMPLES_COUNT
+    if is_p99_comparable and result["p99_ms"] > baseline_result["p99_ms"] * (1 + tolerance) + P99_JITTER_MS:
+        regressions.append("p99")
+    if result["peak_rss_mb"] > baseline_result["peak_rss_mb"] * (1 + tolerance):
+        regressions.append("peak RSS")
+    return regressions
+
+
+def main():
+    """Runs all cases, prints their results and compares them with baseline"""
+    args = _parse_arguments()
+    if args.run_case is not None:
+        print(json.dumps(_run_case(json.loads(args.run_case))))
+        return 0
+
+    if args.repeats <= 0:
+        print("Repeats count should be positive", file=sys.stderr)
+        return 2
+    corpora = [_parse_corpus(corpus) for corpus in args.corpora] if args.corpora is not None else CORPORA
+    baseline = {}
+    if not args.save_baseline:
+        if not os.path.isfile(args.baseline):
+            print(
+                f"Baseline {args.baseline} does not exist, run with --save-baseline to create it",
+                file=sys.stderr)
+            return 2
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = {}
+    regressions_count = 0
+    failures_count = 0
+    missing_baselines_count = 0
+    print(f"{'case':<62} {'images/s':>9} {'p50, ms':>9} {'p99, ms':>9} {'RSS, MB':>8}  baseline")
+
+    for settings_path in args.settings:
+        for width, height, images_count in corpora:
+            corpus_path = _prepare_corpus(width, height, images_count)
+            for executor in args.executors:
+                case_name = f"{settings_path} {width}x{height}x{images_count} {executor}"
+                result = _run_case_repeatedly(
+                    {"settings_path": settings_path, "corpus_path": corpus_path, "executor": executor},
+                    args.repeats)
+                if result is None:
+                    failures_count += 1
+                    print(f"{case_name:<62} FAILED")
+                    continue
+                results[case_name] = result
+
+                if args.save_baseline:
+                    comparison = "saved"
+                elif case_name in baseline:
+                    regressions = _find_regressions(result, baseline[case_name], args.tolerance)
+                    regressions_count += 1 if regressions else 0
+                    comparison = f"REGRESSION ({', '.join(regressions)})" if regressions else "ok"
+                else:
+                    missing_baselines_count += 1
+                    comparison = "NO BASELINE"
+                print(
+                    f"{case_name:<62} {result['images_per_second']:>9.2f} {result['p50_ms']:>9.2f}"
+                    f" {result['p99_ms']:>9.2f} {result['peak_rss_mb']:>8.1f}  {comparison}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=4)
+        print(f"Baseline is saved to {args.baseline}")
+
+    if regressions_count > 0:
+        print(f"{regressions_count} cases regressed beyond {args.tolerance:.0%} of baseline", file=sys.stderr)
+    if failures_count > 0:
+        print(f"{failures_count} cases failed", file=sys.stderr)
+    if missing_baselines_count > 0:
+        print(
+            f"{missing_baselines_count} cases are not in baseline, run with --save-baseline to add them",
+            file=sys.stderr)
+    return 1 if regressions_count > 0 or failures_count > 0 or missing_baselines_count > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Benchmark of white area size method against per-row thread pool implementation
+
+Run from the TVS directory: python3 -m benchmarks.white_area_size_benchmark
+"""
+import multiprocessing
+import timeit
+from multiprocessing.dummy import Pool as ThreadPool
+import numpy as np
+from details_extraction.white_area_size import white_area_size, WHITE_PIXEL_VALUE
+
+
+IMAGE_SIZES = ((480, 640), (1080, 1920), (2160, 3840))
+REPEATS_COUNT = 20
+
+
+def _row_pool_white_area_size(black_white_image, method_parameters):
+    # White area size implementation before vectorization: thread pool per image, task per row
+    scale = method_parameters["scale"] if "scale" in method_parameters else 1
+    cpu_count = multiprocessing.cpu_count()
+    with ThreadPool(cpu_count) as pool:
+        result = pool.map(_count_row_white_pixels, black_white_image)
+        return sum(result) / scale
+
+
+def _count_row_white_pixels(line):
+    return np.count_nonzero(line == WHITE_PIXEL_VALUE)
+
+
+def _black_white_image(height, width):
+    random_generator = np.random.default_rng(height * width)
+    return np.where(random_generator.random((height, width)) > 0.5, WHITE_PIXEL_VALUE, 0).astype(np.uint8)
+
+
+def _measure(method, image, method_parameters):
+    return min(timeit.repeat(lambda: method(image, method_parameters), number=1, repeat=REPEATS_COUNT))
+
+
+def main():
+    """Prints best time of both implementations for several image sizes"""
+    method_parameters = {"scale": 1000}
+    tiled_method_parameters = {"scale": 1000, "tile_height": 256}
+    print(f"{'image size':>12} {'row pool, ms':>14} {'vectorized, ms':>16} {'tiled, ms':>11} {'speedup':>9}")
+
+    for height, width in IMAGE_SIZES:
+        image = _black_white_image(height, width)
+        expected_area = _row_pool_white_area_size(image, method_parameters)
+        if white_area_size(image, method_parameters) != expected_area or\
+                white_area_size(image, tiled_method_parameters) != expected_area:
+            raise RuntimeError("White area size results are different")
+
+        row_pool_time = _measure(_row_pool_white_area_size, image, method_parameters)
+        vectorized_time = _measure(white_area_size, image, method_parameters)
+        tiled_time = _measure(white_area_size, image, tiled_method_parameters)
+        print(
+            f"{width:>5}x{height:<6} {row_pool_time * 1000:>14.2f} {vectorized_time * 1000:>16.2f}"
+            f" {tiled_time * 1000:>11.2f} {row_pool_time / vectorized_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,24 @@ import numpy as np
 
 
 def extract_largest_contour(black_white_image, method_parameters):
-    """Extract largest contour on an black and white image via OpenCV"""
-    _, contours, _ = cv2.findContours(black_white_image.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    largest_contour = sorted(contours, key=cv2.contourArea, reverse=True)[0]
+    """Extract box of largest contour on an black and white image via OpenCV (None if there are no contours)"""
+    # Source image is not modified by findContours since OpenCV 3.2, so it is not copied
+    # OpenCV 3 returns (image, contours, hierarchy), OpenCV 4 returns (contours, hierarchy)
+    contours = cv2.findContours(black_white_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+    if len(contours) == 0:
+        return None
+
+    largest_contour = max(contours, key=cv2.contourArea)
     largest_contour_area = cv2.minAreaRect(largest_contour)
-    box = np.int0(cv2.boxPoints(largest_contour_area))
+    box = cv2.boxPoints(largest_contour_area).astype(np.intp)
 
     return box
+
+
+def prepare_extract_largest_contour(method_parameters):
+    """Returns largest contour extraction function of image"""
+    return _extract_largest_contour
+
+
+def _extract_largest_contour(black_white_image):
+    return extract_largest_contour(black_white_image, None)
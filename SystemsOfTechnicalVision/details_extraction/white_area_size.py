@@ -1,7 +1,6 @@
 #!/usr/bin/python3
 """TVS white area size in pixels"""
-import multiprocessing
-from multiprocessing.dummy import Pool as ThreadPool
+import cv2
 import numpy as np
 
 
@@ -10,16 +9,74 @@ WHITE_PIXEL_VALUE = 255
 
 def white_area_size(black_white_image, method_parameters):
     """Method which calculates white pixels area on images"""
+    return prepare_white_area_size(method_parameters)(black_white_image)
+
+
+def prepare_white_area_size(method_parameters):
+    """Validates parameters once and returns white area size function of image
+
+    Optional parameters: "roi" - "x,y,width,height" area of image to count,
+    "mask_path" - image where non-zero pixels mark counted area (of the roi size if roi is set),
+    "tile_height" - count by horizontal strips to limit temporary memory on huge images.
+    """
     scale = method_parameters["scale"] if "scale" in method_parameters else 1
 
     if scale <= 0:
         raise ValueError("Scale in white area size method should be positive")
 
-    cpu_count = multiprocessing.cpu_count()
-    with ThreadPool(cpu_count) as pool:
-        result = pool.map(_count_white_pixels, black_white_image)
-        return sum(result) / scale
+    roi = _get_roi_from_parameter(method_parameters["roi"]) if "roi" in method_parameters else None
+    mask = _read_mask(method_parameters["mask_path"]) if "mask_path" in method_parameters else None
+    tile_height = method_parameters["tile_height"] if "tile_height" in method_parameters else None
+
+    if tile_height is not None and tile_height <= 0:
+        raise ValueError("Tile height in white area size method should be positive")
+
+    def _white_area_size(black_white_image):
+        image = black_white_image[roi] if roi is not None else black_white_image
+
+        if mask is not None and mask.shape != image.shape[:2]:
+            raise ValueError("Mask size of white area size method is not equal to image (or roi) size")
+
+        if tile_height is None:
+            return _count_white_pixels(image, mask) / scale
+
+        white_pixels_count = 0
+        for top in range(0, image.shape[0], tile_height):
+            tile_mask = mask[top:top + tile_height] if mask is not None else None
+            white_pixels_count += _count_white_pixels(image[top:top + tile_height], tile_mask)
+        return white_pixels_count / scale
+
+    return _white_area_size
+
+
+def _count_white_pixels(image, mask):
+    if image.ndim == 2 and image.dtype == np.uint8:
+        white_pixels = cv2.compare(image, WHITE_PIXEL_VALUE, cv2.CMP_EQ)
+        if mask is not None:
+            white_pixels = cv2.bitwise_and(white_pixels, white_pixels, mask=mask)
+        return cv2.countNonZero(white_pixels)
+
+    white_pixels = image == WHITE_PIXEL_VALUE
+    if mask is not None:
+        white_pixels &= (mask != 0).reshape(mask.shape + (1,) * (image.ndim - 2))
+    return int(np.count_nonzero(white_pixels))
+
+
+# roi_parameter_string = "x,y,width,height"
+def _get_roi_from_parameter(roi_parameter_string):
+    try:
+        x, y, width, height = map(int, roi_parameter_string.split(','))
+    except ValueError:
+        raise ValueError(f"Invalid roi for white area size method: {roi_parameter_string}")
+
+    if x < 0 or y < 0 or width <= 0 or height <= 0:
+        raise ValueError(f"Invalid roi for white area size method: {roi_parameter_string}")
+
+    return np.s_[y:y + height, x:x + width]
 
 
-def _count_white_pixels(line):
-    return np.count_nonzero(line == WHITE_PIXEL_VALUE)
+def _read_mask(mask_path):
+    mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+    if mask is None:
+        raise ValueError(f"Mask for white area size method can not be read from {mask_path}")
+    return mask
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""TVS cascade detection with configurable detection resolution and parameters"""
+import cv2
+import numpy as np
+
+
+DEFAULT_SCALE_FACTOR = 1.3
+DEFAULT_MIN_NEIGHBORS = 5
+
+
+class CascadeDetector:
+    """Runs cascade on downscaled copy of image and maps found boxes back to the image coordinates
+
+    Parameters (all optional): scale_factor, min_neighbors, min_size and max_size ([width, height]
+    in pixels of the original image), detection_scale (0..1], detection_pyramid_level (every level
+    halves the image) and detection_max_side (max size of the longer side of detection image).
+    """
+    def __init__(self, method_parameters):
+        self._scale_factor = _get_parameter(method_parameters, "scale_factor", DEFAULT_SCALE_FACTOR)
+        self._min_neighbors = _get_parameter(method_parameters, "min_neighbors", DEFAULT_MIN_NEIGHBORS)
+        self._min_size = _get_size_parameter(method_parameters, "min_size")
+        self._max_size = _get_size_parameter(method_parameters, "max_size")
+        self._detection_scale = _get_parameter(method_parameters, "detection_scale", 1.0)
+        self._detection_max_side = _get_parameter(method_parameters, "detection_max_side", None)
+
+        if "detection_pyramid_level" in method_parameters:
+            pyramid_level = method_parameters["detection_pyramid_level"]
+            if pyramid_level < 0:
+                raise ValueError("Detection pyramid level should not be negative")
+            self._detection_scale = min(self._detection_scale, 0.5 ** pyramid_level)
+
+        if self._scale_factor <= 1:
+            raise ValueError("Scale factor of cascade detection should be greater than 1")
+        if self._min_neighbors < 0:
+            raise ValueError("Min neighbors of cascade detection should not be negative")
+        if not 0 < self._detection_scale <= 1:
+            raise ValueError("Detection scale should be in (0, 1] range")
+        if self._detection_max_side is not None and self._detection_max_side <= 0:
+            raise ValueError("Detection max side should be positive")
+
+    @property
+    def scale_factor(self):
+        """Scale factor between cascade scans of different object sizes"""
+        return self._scale_factor
+
+    @property
+    def min_neighbors(self):
+        """Count of neighbor detections which every found object should have"""
+        return self._min_neighbors
+
+    def detect(self, cascade, image):
+        """Returns boxes (x, y, width, height) of objects found by cascade in coordinates of image"""
+        height, width = image.shape[:2]
+        scale = self._detection_scale
+        if self._detection_max_side is not None:
+            scale = min(scale, self._detection_max_side / max(height, width))
+
+        detection_width, detection_height = max(int(round(width * scale)), 1), max(int(round(height * scale)), 1)
+        if detection_width >= width and detection_height >= height:
+            return cascade.detectMultiScale(image, self._scale_factor, self._min_neighbors, **self._sizes(1, 1))
+
+        detection_image = cv2.resize(image, (detection_width, detection_height), interpolation=cv2.INTER_AREA)
+        scale_x, scale_y = detection_width / width, detection_height / height
+        boxes = cascade.detectMultiScale(
+            detection_image,
+            self._scale_factor,
+            self._min_neighbors,
+            **self._sizes(scale_x, scale_y))
+        if len(boxes) == 0:
+            return boxes
+
+        # Boxes are projected back to the original image
+        back_projection = np.array([1 / scale_x, 1 / scale_y, 1 / scale_x, 1 / scale_y])
+        return np.round(np.asarray(boxes) * back_projection).astype(np.int32)
+
+    def _sizes(self, scale_x, scale_y):
+        sizes = {}
+        if self._min_size is not None:
+            sizes["minSize"] = _scaled_size(self._min_size, scale_x, scale_y)
+        if self._max_size is not None:
+            sizes["maxSize"] = _scaled_size(self._max_size, scale_x, scale_y)
+        return sizes
+
+
+def _get_parameter(method_parameters, key, default_value):
+    return method_parameters[key] if key in method_parameters else default_value
+
+
+def _get_size_parameter(method_parameters, key):
+    if key not in method_parameters:
+        return None
+    size = method_parameters[key]
+    if len(size) != 2 or size[0] <= 0 or size[1] <= 0:
+        raise ValueError(f"Size parameter {key} should be [width, height] with positive values")
+    return int(size[0]), int(size[1])
+
+
+def _scaled_size(size, scale_x, scale_y):
+    return max(int(round(size[0] * scale_x)), 1), max(int(round(size[1] * scale_y)), 1)
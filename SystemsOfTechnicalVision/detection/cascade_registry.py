@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""TVS registry of haar cascades loaded once per worker"""
+import os
+import threading
+import time
+import cv2
+
+
+# Cascade files are checked for changes at most once per this count of seconds (per worker thread),
+# eviction of cascades after changing of settings reloads them at once
+MODIFICATION_CHECK_INTERVAL = 5.0
+
+# OpenCV cascade classifiers are not safe for concurrent detectMultiScale calls,
+# so every worker thread keeps own instances: {cascade_path: [modification_time, cascade, check_time]}
+_thread_local_storage = threading.local()
+_registry_generation = 0
+_registry_lock = threading.Lock()
+
+
+def get_cascade(cascade_path):
+    """Returns cascade classifier for path, file is parsed again only if it was changed"""
+    cascades = _get_thread_cascades()
+    cached_cascade = cascades.get(cascade_path)
+    current_time = time.monotonic()
+    if cached_cascade is not None and current_time - cached_cascade[2] < MODIFICATION_CHECK_INTERVAL:
+        return cached_cascade[1]
+
+    modification_time = os.path.getmtime(cascade_path) if os.path.exists(cascade_path) else None
+    if cached_cascade is not None and cached_cascade[0] == modification_time:
+        cached_cascade[2] = current_time
+        return cached_cascade[1]
+
+    cascade = cv2.CascadeClassifier(cascade_path)
+    if cascade.empty():
+        raise ValueError(f"Cascade can not be loaded from {cascade_path}")
+
+    cascades[cascade_path] = [modification_time, cascade, current_time]
+    return cascade
+
+
+def evict_cascades():
+    """Drops all loaded cascades of all worker threads (e.g. when settings file was changed)"""
+    global _registry_generation
+    with _registry_lock:
+        _registry_generation += 1
+
+
+def get_cascades_generation():
+    """Returns generation of loaded cascades, it is changed by every eviction"""
+    return _registry_generation
+
+
+def sync_cascades_generation(generation):
+    """Drops cascades of worker process if cascades of the main process were evicted after the fork"""
+    global _registry_generation
+    with _registry_lock:
+        _registry_generation = generation
+
+
+def _get_thread_cascades():
+    if getattr(_thread_local_storage, "generation", None) != _registry_generation:
+        _thread_local_storage.generation = _registry_generation
+        _thread_local_storage.cascades = {}
+    return _thread_local_storage.cascades
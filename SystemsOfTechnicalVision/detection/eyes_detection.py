@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""TVS detection of eyes inside found faces"""
+import math
+import multiprocessing
+import os
+import threading
+from multiprocessing.dummy import Pool as ThreadPool
+import numpy as np
+from detection.cascade_registry import get_cascade
+
+
+SEQUENTIAL_EYES_DETECTION = "sequential"
+CONCURRENT_EYES_DETECTION = "concurrent"
+MOSAIC_EYES_DETECTION = "mosaic"
+EYES_DETECTION_MODES = (
+    SEQUENTIAL_EYES_DETECTION,
+    CONCURRENT_EYES_DETECTION,
+    MOSAIC_EYES_DETECTION)
+
+# Empty space between faces of mosaic, eyes found across faces are dropped
+MOSAIC_GAP = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def detect_eyes(eye_cascade_path, image, faces, mode=SEQUENTIAL_EYES_DETECTION):
+    """Returns eyes for every face (in coordinates of face area) detected in the given mode"""
+    if mode not in EYES_DETECTION_MODES:
+        raise ValueError(f"Unsupported eyes detection mode: {mode}")
+    face_areas = [image[y:y + height, x:x + width] for x, y, width, height in faces]
+
+    if mode == CONCURRENT_EYES_DETECTION and len(face_areas) > 1:
+        # Every pool thread uses own cascade instance from the registry
+        return _get_pool().map(
+            lambda face_area: get_cascade(eye_cascade_path).detectMultiScale(face_area),
+            face_areas)
+    if mode == MOSAIC_EYES_DETECTION and len(face_areas) > 1:
+        return _detect_eyes_in_mosaic(get_cascade(eye_cascade_path), face_areas)
+
+    eye_cascade = get_cascade(eye_cascade_path)
+    return [eye_cascade.detectMultiScale(face_area) for face_area in face_areas]
+
+
+def _detect_eyes_in_mosaic(eye_cascade, face_areas):
+    # Face areas are packed to shelves of mosaic image, so cascade is run once for all faces
+    total_area = sum((area.shape[0] + MOSAIC_GAP) * (area.shape[1] + MOSAIC_GAP) for area in face_areas)
+    mosaic_width = max(max(area.shape[1] for area in face_areas), int(math.sqrt(total_area)))
+    positions = [None] * len(face_areas)
+    x, y, shelf_height = 0, 0, 0
+
+    for face_index in sorted(range(len(face_areas)), key=lambda index: -face_areas[index].shape[0]):
+        height, width = face_areas[face_index].shape[:2]
+        if x > 0 and x + width > mosaic_width:
+            x, y, shelf_height = 0, y + shelf_height + MOSAIC_GAP, 0
+        positions[face_index] = (x, y)
+        x += width + MOSAIC_GAP
+        shelf_height = max(shelf_height, height)
+
+    first_area = face_areas[0]
+    mosaic = np.zeros((y + shelf_height, mosaic_width) + first_area.shape[2:], first_area.dtype)
+    for (x, y), face_area in zip(positions, face_areas):
+        mosaic[y:y + face_area.shape[0], x:x + face_area.shape[1]] = face_area
+
+    faces_eyes = [[] for _ in face_areas]
+    for eye_x, eye_y, eye_width, eye_height in eye_cascade.detectMultiScale(mosaic):
+        for face_index, ((x, y), face_area) in enumerate(zip(positions, face_areas)):
+            if x <= eye_x and eye_x + eye_width <= x + face_area.shape[1]\
+                    and y <= eye_y and eye_y + eye_height <= y + face_area.shape[0]:
+                faces_eyes[face_index].append((eye_x - x, eye_y - y, eye_width, eye_height))
+                break
+    return faces_eyes
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPool(multiprocessing.cpu_count())
+        return _pool
+
+
+def _drop_pool_after_fork():
+    # Threads of parent pool do not exist in forked worker process
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_drop_pool_after_fork)
@@ -1,36 +1,52 @@
 #!/usr/bin/python3
 """TVS face detection method"""
-import cv2
+from detection.cascade_registry import get_cascade
+from detection.cascade_detector import CascadeDetector
+from detection.eyes_detection import detect_eyes as detect_faces_eyes, EYES_DETECTION_MODES
 
 
 def face_detection_method(image_data, image_details, method_parameters):
     """Face detection method via OpenCV"""
-    detect_eyes = method_parameters["detect_eyes"]
-    face_cascade, eye_cascade = _get_cascades(method_parameters, detect_eyes)
-    scale_factor = 1.3
-    min_neighbors = 5
-
-    faces = face_cascade.detectMultiScale(image_data, scale_factor, min_neighbors)
-
-    if detect_eyes:
-        result = []
-        for face in faces:
-            x, y, width, height = face
-            face_area = image_data[y:y + height, x:x + width]
-            eyes = eye_cascade.detectMultiScale(face_area)
-            result.append((face, eyes))
-        return image_data, result
-    else:
-        return image_data, ((face, None) for face in faces)
-
-
-def _get_cascades(method_parameters, is_detect_eyes):
+    return prepare_face_detection_method(method_parameters)(image_data, image_details)
+
+
+def prepare_face_detection_method(method_parameters):
+    """Validates parameters and cascades once and returns face detection function"""
+    if "face_cascade_path" not in method_parameters:
+        raise ValueError("Face cascade path not defined for the face detection method.")
+
+    detect_eyes = method_parameters["detect_eyes"] if "detect_eyes" in method_parameters else False
+    if detect_eyes and "eye_cascade_path" not in method_parameters:
+        raise ValueError("Eye cascade path not defined for the face detection method.")
+
+    key = "eyes_detection_mode"
+    eyes_detection_mode = method_parameters[key] if key in method_parameters else EYES_DETECTION_MODES[0]
+    if eyes_detection_mode not in EYES_DETECTION_MODES:
+        raise ValueError(f"Unsupported eyes detection mode: {eyes_detection_mode}")
+
     face_cascade_path = method_parameters["face_cascade_path"]
-    face_detection_cascade = cv2.CascadeClassifier(face_cascade_path)
+    eye_cascade_path = method_parameters["eye_cascade_path"] if detect_eyes else None
+    _get_cascades(face_cascade_path, eye_cascade_path)
+    detector = CascadeDetector(method_parameters)
+
+    def _face_detection_method(image_data, image_details):
+        face_cascade, _ = _get_cascades(face_cascade_path, eye_cascade_path)
+        faces = detector.detect(face_cascade, image_data)
+
+        if detect_eyes:
+            faces_eyes = detect_faces_eyes(eye_cascade_path, image_data, faces, eyes_detection_mode)
+            return image_data, list(zip(faces, faces_eyes))
+        else:
+            return image_data, [(face, None) for face in faces]
+
+    return _face_detection_method
+
+
+def _get_cascades(face_cascade_path, eye_cascade_path):
+    face_detection_cascade = get_cascade(face_cascade_path)
     eye_detection_cascade = None
 
-    if is_detect_eyes:
-        eye_cascade_path = method_parameters["eye_cascade_path"]
-        eye_detection_cascade = cv2.CascadeClassifier(eye_cascade_path)
+    if eye_cascade_path is not None:
+        eye_detection_cascade = get_cascade(eye_cascade_path)
 
     return (face_detection_cascade, eye_detection_cascade)
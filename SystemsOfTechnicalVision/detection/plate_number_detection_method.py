@@ -1,16 +1,26 @@
 #!/usr/bin/python3
 """TVS russian plate number detection method"""
-import cv2
+from detection.cascade_registry import get_cascade
+from detection.cascade_detector import CascadeDetector
 
 
 def plate_number_detection_method(image_data, image_details, method_parameters):
     """Russian plate numbers detection method via OpenCV"""
+    return prepare_plate_number_detection_method(method_parameters)(image_data, image_details)
+
+
+def prepare_plate_number_detection_method(method_parameters):
+    """Validates parameters and cascade once and returns plate numbers detection function"""
     if "plate_cascade_path" not in method_parameters:
         raise ValueError("Plate cascade not defined for the plates detection method.")
 
     plates_cascade_path = method_parameters["plate_cascade_path"]
-    plate_cascade = cv2.CascadeClassifier(plates_cascade_path)
-    scale_factor = 1.3
-    min_neighbors = 5
-    plates = plate_cascade.detectMultiScale(image_data, scale_factor, min_neighbors)
-    return image_data, plates
+    get_cascade(plates_cascade_path)
+    detector = CascadeDetector(method_parameters)
+
+    def _plate_number_detection_method(image_data, image_details):
+        plate_cascade = get_cascade(plates_cascade_path)
+        plates = detector.detect(plate_cascade, image_data)
+        return image_data, plates
+
+    return _plate_number_detection_method
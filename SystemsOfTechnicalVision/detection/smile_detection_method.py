@@ -1,16 +1,26 @@
 #!/usr/bin/python3
 """TVS smile detection method"""
-import cv2
+from detection.cascade_registry import get_cascade
+from detection.cascade_detector import CascadeDetector
 
 
 def smile_detection_method(image_data, image_details, method_parameters):
     """Smile detection method via OpenCV"""
+    return prepare_smile_detection_method(method_parameters)(image_data, image_details)
+
+
+def prepare_smile_detection_method(method_parameters):
+    """Validates parameters and cascade once and returns smile detection function"""
     if "smile_cascade_path" not in method_parameters:
         raise ValueError("Smile cascade path not defined for the smile detection method.")
 
     smile_cascade_path = method_parameters["smile_cascade_path"]
-    smile_cascade = cv2.CascadeClassifier(smile_cascade_path)
-    scale_factor = 1.3
-    min_neighbors = 5
-    smiles = smile_cascade.detectMultiScale(image_data, scale_factor, min_neighbors)
-    return image_data, smiles
+    get_cascade(smile_cascade_path)
+    detector = CascadeDetector(method_parameters)
+
+    def _smile_detection_method(image_data, image_details):
+        smile_cascade = get_cascade(smile_cascade_path)
+        smiles = detector.detect(smile_cascade, image_data)
+        return image_data, smiles
+
+    return _smile_detection_method
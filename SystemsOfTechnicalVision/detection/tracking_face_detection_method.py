@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+"""TVS face detection method which tracks faces on consecutive video frames"""
+import threading
+import cv2
+import numpy as np
+from detection.cascade_registry import get_cascade
+from detection.cascade_detector import CascadeDetector
+from detection.eyes_detection import detect_eyes as detect_faces_eyes, EYES_DETECTION_MODES
+
+
+# Size of frame thumbnails compared for scene change detection
+_THUMBNAIL_SIZE = (32, 32)
+
+
+def tracking_face_detection_method(image_data, image_details, method_parameters):
+    """Face detection method via OpenCV with tracking (without tracking for a single call)"""
+    return prepare_tracking_face_detection_method(method_parameters)(image_data, image_details)
+
+
+def prepare_tracking_face_detection_method(method_parameters):
+    """Validates parameters and cascades once and returns face detection function with tracking state
+
+    Full frame is scanned every full_scan_interval frames or on scene change, other frames are
+    scanned only around faces of the previous frame (extended by roi_margin of face size).
+    Face which is not found again is kept as lost for lost_track_frames frames, full frame is
+    scanned while any face is lost.
+    Tracking state is kept per worker thread, so frames of a video should be processed in order
+    by the same worker (serial executor or single worker of pipeline detection stage).
+    """
+    if "face_cascade_path" not in method_parameters:
+        raise ValueError("Face cascade path not defined for the tracking face detection method.")
+
+    detect_eyes = method_parameters["detect_eyes"] if "detect_eyes" in method_parameters else False
+    if detect_eyes and "eye_cascade_path" not in method_parameters:
+        raise ValueError("Eye cascade path not defined for the tracking face detection method.")
+
+    full_scan_interval = _get_parameter(method_parameters, "full_scan_interval", 10)
+    roi_margin = _get_parameter(method_parameters, "roi_margin", 0.5)
+    scene_change_threshold = _get_parameter(method_parameters, "scene_change_threshold", 30)
+    lost_track_frames = _get_parameter(method_parameters, "lost_track_frames", 3)
+    if full_scan_interval <= 0:
+        raise ValueError("Full scan interval of tracking face detection method should be positive")
+    if roi_margin < 0:
+        raise ValueError("ROI margin of tracking face detection method should not be negative")
+    if lost_track_frames < 0:
+        raise ValueError("Lost track frames of tracking face detection method should not be negative")
+
+    eyes_detection_mode = _get_parameter(method_parameters, "eyes_detection_mode", EYES_DETECTION_MODES[0])
+    if eyes_detection_mode not in EYES_DETECTION_MODES:
+        raise ValueError(f"Unsupported eyes detection mode: {eyes_detection_mode}")
+
+    face_cascade_path = method_parameters["face_cascade_path"]
+    eye_cascade_path = method_parameters["eye_cascade_path"] if detect_eyes else None
+    get_cascade(face_cascade_path)
+    if detect_eyes:
+        get_cascade(eye_cascade_path)
+    detector = CascadeDetector(method_parameters)
+    tracking_state = threading.local()
+
+    def _detect_in_roi(face_cascade, image_data, tracked_face):
+        x, y, width, height = tracked_face
+        margin_x, margin_y = int(width * roi_margin), int(height * roi_margin)
+        left, top = max(x - margin_x, 0), max(y - margin_y, 0)
+        right = min(x + width + margin_x, image_data.shape[1])
+        bottom = min(y + height + margin_y, image_data.shape[0])
+
+        # Face moves a few pixels between frames and its size changes slowly
+        faces = face_cascade.detectMultiScale(
+            image_data[top:bottom, left:right],
+            detector.scale_factor,
+            detector.min_neighbors,
+            minSize=(width // 2, height // 2),
+            maxSize=(width * 2, height * 2))
+        return [(int(face_x) + left, int(face_y) + top, int(face_width), int(face_height))
+                for face_x, face_y, face_width, face_height in faces]
+
+    def _tracking_face_detection_method(image_data, image_details):
+        face_cascade = get_cascade(face_cascade_path)
+        thumbnail = cv2.resize(image_data, _THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        frames_since_full_scan = getattr(tracking_state, "frames_since_full_scan", None)
+        previous_thumbnail = getattr(tracking_state, "thumbnail", None)
+        # Tracks are faces of the previous frame and lost faces with count of frames they are missed
+        tracks = [(face, 0) for face in tracking_state.faces] + tracking_state.lost_faces\
+            if previous_thumbnail is not None else []
+
+        is_scene_changed = previous_thumbnail is None\
+            or previous_thumbnail.shape != thumbnail.shape\
+            or np.abs(thumbnail - previous_thumbnail).mean() > scene_change_threshold
+
+        if is_scene_changed:
+            tracks = []
+        if is_scene_changed or tracking_state.lost_faces or frames_since_full_scan + 1 >= full_scan_interval:
+            faces = [
+                tuple(int(value) for value in face)
+                for face in detector.detect(face_cascade, image_data)]
+            missed_tracks = [track for track in tracks if not _is_any_center_inside(faces, track[0])]
+            tracking_state.frames_since_full_scan = 0
+        else:
+            faces, missed_tracks = [], []
+            for track in tracks:
+                track_faces = _detect_in_roi(face_cascade, image_data, track[0])
+                if not track_faces:
+                    missed_tracks.append(track)
+                for face in track_faces:
+                    if not _is_center_inside_any(face, faces):
+                        faces.append(face)
+            tracking_state.frames_since_full_scan = frames_since_full_scan + 1
+
+        tracking_state.thumbnail = thumbnail
+        tracking_state.faces = faces
+        # Faces missed by one search (blink, motion blur, occlusion) are searched again by full scans
+        tracking_state.lost_faces = [
+            (face, missed_frames_count + 1) for face, missed_frames_count in missed_tracks
+            if missed_frames_count < lost_track_frames and not _is_any_center_inside(faces, face)]
+
+        if detect_eyes:
+            faces_eyes = detect_faces_eyes(eye_cascade_path, image_data, faces, eyes_detection_mode)
+            return image_data, list(zip(faces, faces_eyes))
+        return image_data, [(face, None) for face in faces]
+
+    return _tracking_face_detection_method
+
+
+def _get_parameter(method_parameters, key, default_value):
+    return method_parameters[key] if key in method_parameters else default_value
+
+
+def _is_any_center_inside(faces, region):
+    # Found face is the same face as tracked one if its center is inside the tracked region
+    return any(_is_center_inside_any(face, [region]) for face in faces)
+
+
+def _is_center_inside_any(face, faces):
+    # Regions of close faces overlap, so the same face can be found twice
+    x, y, width, height = face
+    center_x, center_y = x + width // 2, y + height // 2
+    return any(
+        other_x <= center_x < other_x + other_width and other_y <= center_y < other_y + other_height
+        for other_x, other_y, other_width, other_height in faces)
@@ -5,6 +5,11 @@ import cv2
 
 def cv2_binarization_filter(gray_image, filter_parameters):
     """RGB to gray filter"""
+    return prepare_cv2_binarization_filter(filter_parameters)(gray_image)
+
+
+def prepare_cv2_binarization_filter(filter_parameters):
+    """Validates binarization parameters once and returns filter function of image"""
     if "lower_threshold" not in filter_parameters or "upper_threshold" not in filter_parameters:
         raise ValueError("Thresholds was not specified for binarization filters.")
 
@@ -14,8 +19,12 @@ def cv2_binarization_filter(gray_image, filter_parameters):
     if _is_invalid_threshold(lower_threshold, upper_threshold):
         raise ValueError("Binarization thresholds error")
 
-    retval, binarized_image = cv2.threshold(gray_image, lower_threshold, upper_threshold, cv2.THRESH_BINARY)
-    return binarized_image
+    def _binarization_filter(gray_image, dst=None):
+        retval, binarized_image = cv2.threshold(
+            gray_image, lower_threshold, upper_threshold, cv2.THRESH_BINARY, dst=dst)
+        return binarized_image
+
+    return _binarization_filter
 
 
 def _is_invalid_threshold(lower, upper):
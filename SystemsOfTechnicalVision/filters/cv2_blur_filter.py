@@ -5,8 +5,20 @@ import cv2
 
 def cv2_blur_filter(image, filter_parameters):
     """Blur filter via OpenCV"""
+    return prepare_cv2_blur_filter(filter_parameters)(image)
+
+
+def prepare_cv2_blur_filter(filter_parameters):
+    """Validates blur parameters once and returns filter function of image"""
     if "radius" not in filter_parameters:
         raise ValueError("Radius for blur filter was not specified")
 
     radius = filter_parameters["radius"]
-    return cv2.blur(image, (radius, radius))
+    if radius <= 0:
+        raise ValueError("Radius for blur filter should be positive")
+    kernel_size = (radius, radius)
+
+    def _blur_filter(image, dst=None):
+        return cv2.blur(image, kernel_size, dst=dst)
+
+    return _blur_filter
@@ -5,7 +5,18 @@ import cv2
 
 def cv2_dilate_filter(black_white_image, filter_parameters):
     """Dilate filter via OpenCV"""
+    return prepare_cv2_dilate_filter(filter_parameters)(black_white_image)
+
+
+def prepare_cv2_dilate_filter(filter_parameters):
+    """Validates dilate parameters once and returns filter function of image"""
     if "iterations_count" not in filter_parameters:
         raise ValueError("Iterations count not specified for dilate filter")
     iterations_count = filter_parameters["iterations_count"]
-    return cv2.dilate(black_white_image, None, iterations=iterations_count)
\ No newline at end of file
+    if iterations_count < 0:
+        raise ValueError("Iterations count for dilate filter should not be negative")
+
+    def _dilate_filter(black_white_image, dst=None):
+        return cv2.dilate(black_white_image, None, dst=dst, iterations=iterations_count)
+
+    return _dilate_filter
@@ -5,7 +5,18 @@ import cv2
 
 def cv2_erode_filter(black_white_image, filter_parameters):
     """Erode filter via OpenCV"""
+    return prepare_cv2_erode_filter(filter_parameters)(black_white_image)
+
+
+def prepare_cv2_erode_filter(filter_parameters):
+    """Validates erode parameters once and returns filter function of image"""
     if "iterations_count" not in filter_parameters:
         raise ValueError("Iterations count not specified for erode filter")
     iterations_count = filter_parameters["iterations_count"]
-    return cv2.erode(black_white_image, None, iterations=iterations_count)
+    if iterations_count < 0:
+        raise ValueError("Iterations count for erode filter should not be negative")
+
+    def _erode_filter(black_white_image, dst=None):
+        return cv2.erode(black_white_image, None, dst=dst, iterations=iterations_count)
+
+    return _erode_filter
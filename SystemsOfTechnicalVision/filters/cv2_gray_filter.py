@@ -5,4 +5,16 @@ import cv2
 
 def cv2_gray_filter(image, filter_parameters):
     """RGB to gray filter"""
-    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return _gray_filter(image)
+
+
+def prepare_cv2_gray_filter(filter_parameters):
+    """Returns gray filter function of image"""
+    return _gray_filter
+
+
+def _gray_filter(image, dst=None):
+    # Image decoded in grayscale mode is passed through
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=dst)
@@ -6,6 +6,11 @@ import numpy as np
 
 def cv2_hsv_color_range_filter(hvs_image, filter_parameters):
     """HVS color range filter"""
+    return prepare_cv2_hsv_color_range_filter(filter_parameters)(hvs_image)
+
+
+def prepare_cv2_hsv_color_range_filter(filter_parameters):
+    """Parses color range once and returns filter function of image"""
     if "lower_color" not in filter_parameters or "upper_color" not in filter_parameters:
         raise ValueError("Color range was not specified for HVS color range filter.")
 
@@ -15,12 +20,18 @@ def cv2_hsv_color_range_filter(hvs_image, filter_parameters):
     lower_color = _get_color_from_parameter(lower_threshold)
     upper_color = _get_color_from_parameter(upper_threshold)
 
-    return cv2.inRange(hvs_image, lower_color, upper_color)
+    def _hsv_color_range_filter(hvs_image, dst=None):
+        return cv2.inRange(hvs_image, lower_color, upper_color, dst=dst)
+
+    return _hsv_color_range_filter
 
 
 # color_parameter_string = "255,255,255"
 def _get_color_from_parameter(color_parameter_string):
     colour_list_string = color_parameter_string.split(',')  # ["255", "255", "255"]
-    colour_list = list(map(int, colour_list_string))
+    try:
+        colour_list = list(map(int, colour_list_string))
+    except ValueError:
+        raise ValueError(f"Invalid color for HVS color range filter: {color_parameter_string}")
 
     return np.array(colour_list)
@@ -6,3 +6,12 @@ import cv2
 def cv2_hsv_filter(image, filter_parameters):
     """RGB to hsv filter"""
     return cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+
+
+def prepare_cv2_hsv_filter(filter_parameters):
+    """Returns hsv filter function of image"""
+    return _hsv_filter
+
+
+def _hsv_filter(image, dst=None):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=dst)
@@ -5,10 +5,19 @@ import cv2
 
 def cv2_morphology_close_filter(image, filter_parameters):
     """Morphology close filter via OpenCV"""
+    return prepare_cv2_morphology_close_filter(filter_parameters)(image)
+
+
+def prepare_cv2_morphology_close_filter(filter_parameters):
+    """Builds morphology kernel once and returns filter function of image"""
     if "kernel_rectangle_width" not in filter_parameters or "kernel_rectangle_height" not in filter_parameters:
         raise ValueError("Kernel rectange parameters for morphlogy close filter were not specified")
     rectangle_width = filter_parameters["kernel_rectangle_width"]
     rectangle_height = filter_parameters["kernel_rectangle_height"]
 
     kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (rectangle_width, rectangle_height))
-    return cv2.morphologyEx(image, cv2.MORPH_CLOSE, kernel)
+
+    def _morphology_close_filter(image, dst=None):
+        return cv2.morphologyEx(image, cv2.MORPH_CLOSE, kernel, dst=dst)
+
+    return _morphology_close_filter
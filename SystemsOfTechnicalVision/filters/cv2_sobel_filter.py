@@ -5,6 +5,11 @@ import cv2
 
 def cv2_sobel_filter(gray_image, filter_parameters):
     """Sobel filter via OpenCV"""
+    return prepare_cv2_sobel_filter(filter_parameters)(gray_image)
+
+
+def prepare_cv2_sobel_filter(filter_parameters):
+    """Validates gradient mode once and returns filter function of image"""
     key = "extract_gradient"
     default_mode = "vertical"
     extract_gradient_mode = filter_parameters[key] if key in filter_parameters else default_mode
@@ -12,14 +17,19 @@ def cv2_sobel_filter(gray_image, filter_parameters):
     if _is_invalid_mode(extract_gradient_mode):
         raise ValueError("Unsopported extract gradient mode")
 
-    gradient_x = cv2.Sobel(gray_image, ddepth=cv2.CV_32F, dx=1, dy=0, ksize=-1)
-    gradient_y = cv2.Sobel(gray_image, ddepth=cv2.CV_32F, dx=0, dy=1, ksize=-1)
+    is_vertical_mode = extract_gradient_mode == "vertical"
+
+    def _sobel_filter(gray_image, dst=None):
+        gradient_x = cv2.Sobel(gray_image, ddepth=cv2.CV_32F, dx=1, dy=0, ksize=-1)
+        gradient_y = cv2.Sobel(gray_image, ddepth=cv2.CV_32F, dx=0, dy=1, ksize=-1)
+
+        if is_vertical_mode:
+            gradient = cv2.subtract(gradient_x, gradient_y)
+        else:
+            gradient = cv2.subtract(gradient_y, gradient_x)
+        return cv2.convertScaleAbs(gradient, dst=dst)
 
-    if extract_gradient_mode == "vertical":
-        gradient = cv2.subtract(gradient_x, gradient_y)
-    else:
-        gradient = cv2.subtract(gradient_y, gradient_x)
-    return cv2.convertScaleAbs(gradient)
+    return _sobel_filter
 
 
 def _is_invalid_mode(extract_gradient_mode):
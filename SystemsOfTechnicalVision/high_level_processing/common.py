@@ -1,32 +1,188 @@
 #!/usr/bin/python3
 """TVS common functions for high-level processing"""
+import atexit
 import cv2
+import multiprocessing
 import os
+import threading
 import uuid
+from queue import Queue
+from sources.frame_store import FrameStoreWriter, process_store_path, merge_process_stores
 
 
 OUTPUT_DIRECTORY_PATH = os.path.join(".", "data", "images", "results")
 
+JPEG_IMAGE_FORMAT = "jpg"
+PNG_IMAGE_FORMAT = "png"
+IMAGE_FORMATS = (JPEG_IMAGE_FORMAT, PNG_IMAGE_FORMAT)
+
+DEFAULT_RESULT_WRITER_SETTINGS = {
+    "threads_count": 2,
+    "queue_depth": 32,
+    "image_format": JPEG_IMAGE_FORMAT,
+    "jpeg_quality": 95,
+    "png_compression": 3,
+    "intermediate_store_path": None
+}
+
+
+class ResultWriter:
+    """Writes images to files on background threads, images wait in a bounded queue
+
+    If intermediate store path is set, intermediate images are appended to frame store.
+    Every worker process appends to own store with process id in its name, the stores
+    are merged to the store of the path and removed when the main process flushes results.
+    """
+    def __init__(
+            self, threads_count, queue_depth, image_format, jpeg_quality, png_compression,
+            intermediate_store_path=None):
+        if threads_count <= 0 or queue_depth <= 0:
+            raise ValueError("Threads count and queue depth of result writer should be positive")
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported result image format: {image_format}")
+
+        self.image_format = image_format
+        self._encode_parameters = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]\
+            if image_format == JPEG_IMAGE_FORMAT else [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+        self._threads_count = threads_count
+        self._queue = Queue(queue_depth)
+        self._threads = []
+        self._threads_lock = threading.Lock()
+        self._errors = []
+        self._intermediate_store_path = intermediate_store_path
+        self._intermediate_store = None
+
+    @property
+    def is_intermediate_store_used(self):
+        """Determines that intermediate images are written to frame store instead of files"""
+        return self._intermediate_store_path is not None
+
+    def write(self, image, path):
+        """Enqueues copy of image for writing (waits only when the queue is full)"""
+        self._start_threads()
+        self._queue.put((image.copy(), path))
+
+    def write_intermediate(self, image, name):
+        """Appends raw image to intermediate store (without encoding and queue)"""
+        with self._threads_lock:
+            if self._intermediate_store is None:
+                self._intermediate_store = FrameStoreWriter(process_store_path(self._intermediate_store_path))
+            self._intermediate_store.append(image, name)
+
+    def flush(self):
+        """Waits until all enqueued images are written, raises first writing error"""
+        self._queue.join()
+        with self._threads_lock:
+            # Store is opened again by the next intermediate image, so descriptor is not kept between runs
+            if self._intermediate_store is not None:
+                self._intermediate_store.close()
+                self._intermediate_store = None
+        if self._errors:
+            error = self._errors[0]
+            self._errors.clear()
+            raise error
+
+    def _start_threads(self):
+        if self._threads:
+            return
+        with self._threads_lock:
+            while len(self._threads) < self._threads_count:
+                thread = threading.Thread(target=self._write_images, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _write_images(self):
+        while True:
+            image, path = self._queue.get()
+            try:
+                cv2.imwrite(path, image, self._encode_parameters)
+            except Exception as error:
+                self._errors.append(error)
+            finally:
+                self._queue.task_done()
+
+
+_result_writer_settings = dict(DEFAULT_RESULT_WRITER_SETTINGS)
+_result_writer = None
+_result_writer_lock = threading.Lock()
+_created_directories = set()
+
+
+def configure_result_writer(**settings):
+    """Changes settings of result writer (pending images are written with previous settings)"""
+    global _result_writer
+    unknown_settings = set(settings) - set(DEFAULT_RESULT_WRITER_SETTINGS)
+    if unknown_settings:
+        raise ValueError(f"Unknown result writer settings: {', '.join(sorted(unknown_settings))}")
+
+    new_settings = dict(DEFAULT_RESULT_WRITER_SETTINGS, **settings)
+    ResultWriter(**new_settings)  # validates settings, threads are not started before writing
+    with _result_writer_lock:
+        if new_settings != _result_writer_settings:
+            if _result_writer is not None:
+                _result_writer.flush()
+            _result_writer_settings.update(new_settings)
+            _result_writer = None
+
+
+def get_result_writer_settings():
+    """Returns current settings of result writer"""
+    return dict(_result_writer_settings)
+
+
+def flush_results():
+    """Waits until all enqueued result images are written"""
+    if _result_writer is not None:
+        _result_writer.flush()
+    intermediate_store_path = _result_writer_settings["intermediate_store_path"]
+    if intermediate_store_path is not None and multiprocessing.parent_process() is None:
+        merge_process_stores(intermediate_store_path)
+
 
 def save_to_output_directory(image, filename=None):
     output_filename = filename if filename is not None else str(uuid.uuid4())
-    save_path = os.path.join(OUTPUT_DIRECTORY_PATH, output_filename + ".jpg")
-    cv2.imwrite(save_path, image)
+    writer = _get_result_writer()
+    save_path = os.path.join(OUTPUT_DIRECTORY_PATH, output_filename + "." + writer.image_format)
+    writer.write(image, save_path)
 
 
 def save_filtered_image(filtered_image, directory_name, filter_name=None):
+    unique_id = str(uuid.uuid4())
+    output_filename = filter_name + "_" + unique_id if filter_name is not None else unique_id
+    writer = _get_result_writer()
+    if writer.is_intermediate_store_used:
+        writer.write_intermediate(filtered_image, directory_name + "/" + output_filename)
+        return
+
     save_directory_path = os.path.join(OUTPUT_DIRECTORY_PATH, directory_name)
     _create_directory_if_not_exist(save_directory_path)
+    save_path = os.path.join(save_directory_path, output_filename + "." + writer.image_format)
+    writer.write(filtered_image, save_path)
 
-    unique_id = str(uuid.uuid4())
-    output_filename = filter_name + "_" + unique_id if filter_name is not None else unique_id
-    save_path = os.path.join(save_directory_path, output_filename + ".jpg")
-    cv2.imwrite(save_path, filtered_image)
+
+def _get_result_writer():
+    global _result_writer
+    if _result_writer is None:
+        with _result_writer_lock:
+            if _result_writer is None:
+                _result_writer = ResultWriter(**_result_writer_settings)
+    return _result_writer
 
 
 def _create_directory_if_not_exist(directory_path):
-    if not os.path.exists(directory_path):
-        os.mkdir(directory_path)
+    if directory_path in _created_directories:
+        return
+    os.makedirs(directory_path, exist_ok=True)
+    _created_directories.add(directory_path)
+
+
+def _drop_result_writer_after_fork():
+    # Writer threads do not exist in forked worker process, it creates own writer
+    global _result_writer, _result_writer_lock
+    _result_writer = None
+    _result_writer_lock = threading.Lock()
 
 
 _create_directory_if_not_exist(OUTPUT_DIRECTORY_PATH)
+atexit.register(flush_results)
+os.register_at_fork(after_in_child=_drop_result_writer_after_fork)
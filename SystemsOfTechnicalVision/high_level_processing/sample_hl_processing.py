@@ -5,4 +5,5 @@ from high_level_processing.common import save_to_output_directory
 
 def sample_hl_processing(raw_image, processed_image, image_details, detected_elements_descriptions):
     """Sample of high-level processing function"""
-    save_to_output_directory(processed_image)
+    # Processed image is None when results were taken from the result cache
+    save_to_output_directory(processed_image if processed_image is not None else raw_image)
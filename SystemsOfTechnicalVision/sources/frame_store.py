@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+"""Packed store of raw frames (header, aligned frames and index) which is read through memory map"""
+import glob
+import json
+import multiprocessing
+import os
+import struct
+import threading
+from collections import namedtuple
+import numpy as np
+
+
+FRAME_STORE_EXTENSION = ".tvsf"
+
+# Header: magic, version, frames count, offset and size of index (index is JSON list of
+# [name, offset, shape, dtype] items written after frames)
+_MAGIC = b"TVSF"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIQQQ")
+_HEADER_SIZE = 64
+# Memory map starts at page boundary, so frames aligned to cache lines are aligned in memory too
+_FRAME_ALIGNMENT = 64
+
+# Frames of stores are passed to workers by reference, every worker maps the store itself
+FrameReference = namedtuple("FrameReference", ["store_path", "frame_index"])
+
+_opened_stores = {}
+_opened_stores_lock = threading.Lock()
+
+
+def is_frame_store(path):
+    """Checks that path is a frame store file"""
+    return path.lower().endswith(FRAME_STORE_EXTENSION)
+
+
+def open_frame_store(path):
+    """Returns store opened by current process (store is opened again if its file is changed or released)"""
+    file_stat = os.stat(path)
+    store_key = (os.path.abspath(path), file_stat.st_mtime_ns, file_stat.st_size)
+    with _opened_stores_lock:
+        frame_store = _opened_stores.get(store_key)
+        if frame_store is None:
+            frame_store = FrameStore(path)
+            _opened_stores[store_key] = frame_store
+        return frame_store
+
+
+def release_frame_stores():
+    """Forgets stores opened by current process, memory maps are closed when their frames are released"""
+    with _opened_stores_lock:
+        _opened_stores.clear()
+
+
+def process_store_path(path):
+    """Returns path of store written by current process (worker processes write own stores)"""
+    if multiprocessing.parent_process() is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{extension}"
+
+
+def merge_process_stores(path):
+    """Appends frames of stores written by worker processes to store of path and removes them, returns count"""
+    root, extension = os.path.splitext(path)
+    process_store_paths = [
+        process_store_path for process_store_path in sorted(glob.glob(f"{glob.escape(root)}.*{extension}"))
+        if process_store_path[len(root) + 1:-len(extension)].isdigit()]
+    if not process_store_paths:
+        return 0
+
+    frames_count = 0
+    with FrameStoreWriter(path) as frame_store_writer:
+        for process_store_path in process_store_paths:
+            frame_store = FrameStore(process_store_path)
+            for frame_index in range(len(frame_store)):
+                frame_store_writer.append(frame_store.frame(frame_index), frame_store.name(frame_index))
+            frames_count += len(frame_store)
+            del frame_store
+            os.remove(process_store_path)
+    return frames_count
+
+
+class FrameStore:
+    """Frames of store file, every frame is a read-only view of memory map"""
+    def __init__(self, path):
+        with open(path, "rb") as store_file:
+            frames_count, index_offset, index_size = _read_header(store_file, path)
+            store_file.seek(index_offset)
+            self._index = json.loads(store_file.read(index_size).decode("utf-8"))
+        if len(self._index) != frames_count:
+            raise ValueError(f"Index of frame store is damaged: {path}")
+        self._path = path
+        self._memory_map = np.memmap(path, np.uint8, mode="r")
+
+    @property
+    def path(self):
+        """Path of store file"""
+        return self._path
+
+    def __len__(self):
+        return len(self._index)
+
+    def name(self, frame_index):
+        """Name of frame given when it was written"""
+        return self._index[frame_index][0]
+
+    def frame(self, frame_index):
+        """Returns frame as read-only view of memory map (a copy is needed to change it)"""
+        _, offset, shape, dtype = self._index[frame_index]
+        return np.ndarray(tuple(shape), np.dtype(dtype), buffer=self._memory_map, offset=offset)
+
+    def frames(self):
+        """Yields all frames in order of writing"""
+        for frame_index in range(len(self._index)):
+            yield self.frame(frame_index)
+
+
+class FrameStoreWriter:
+    """Appends frames to store file, index is written by flush (existing store is continued if appending)
+
+    Frames are written without encoding, so writing is a copy of frame to page cache of the file.
+    New frames and index are written after the previous index and the header is written last,
+    so frames of the last flush are readable if writing is interrupted.
+    """
+    def __init__(self, path, is_appending=True):
+        self._path = path
+        self._lock = threading.Lock()
+        self._index = []
+        self._data_end = _HEADER_SIZE
+        self._is_changed = True
+        open_flags = os.O_RDWR | os.O_CREAT | (0 if is_appending else os.O_TRUNC)
+        self._file_descriptor = os.open(path, open_flags, 0o644)
+
+        if is_appending and os.fstat(self._file_descriptor).st_size > 0:
+            with open(path, "rb") as store_file:
+                _, index_offset, index_size = _read_header(store_file, path)
+                store_file.seek(index_offset)
+                self._index = json.loads(store_file.read(index_size).decode("utf-8"))
+            self._data_end = index_offset + index_size
+            self._is_changed = False
+        else:
+            # Empty store is readable before the first frame is appended
+            self.flush()
+
+    @property
+    def path(self):
+        """Path of store file"""
+        return self._path
+
+    def append(self, frame, name):
+        """Writes frame to the end of store"""
+        frame = np.ascontiguousarray(frame)
+        with self._lock:
+            offset = _aligned(self._data_end)
+            _write_all(self._file_descriptor, memoryview(frame.reshape(-1).view(np.uint8)), offset)
+            self._index.append([name, offset, list(frame.shape), frame.dtype.str])
+            self._data_end = offset + frame.nbytes
+            self._is_changed = True
+
+    def flush(self):
+        """Writes index and header, so all appended frames can be read"""
+        with self._lock:
+            if not self._is_changed:
+                return
+            index_offset = self._data_end
+            index_bytes = json.dumps(self._index).encode("utf-8")
+            _write_all(self._file_descriptor, index_bytes, index_offset)
+            self._data_end = index_offset + len(index_bytes)
+            os.ftruncate(self._file_descriptor, self._data_end)
+            header = _HEADER.pack(_MAGIC, _VERSION, len(self._index), index_offset, len(index_bytes))
+            _write_all(self._file_descriptor, header.ljust(_HEADER_SIZE, b"\0"), 0)
+            self._is_changed = False
+
+    def close(self):
+        """Flushes store and closes its file"""
+        try:
+            self.flush()
+        finally:
+            os.close(self._file_descriptor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _read_header(store_file, path):
+    header = store_file.read(_HEADER_SIZE)
+    if len(header) < _HEADER_SIZE:
+        raise ValueError(f"File is not a frame store: {path}")
+    magic, version, frames_count, index_offset, index_size = _HEADER.unpack_from(header)
+    if magic != _MAGIC:
+        raise ValueError(f"File is not a frame store: {path}")
+    if version != _VERSION:
+        raise ValueError(f"Unsupported version of frame store: {version}")
+    return frames_count, index_offset, index_size
+
+
+def _aligned(offset):
+    return (offset + _FRAME_ALIGNMENT - 1) // _FRAME_ALIGNMENT * _FRAME_ALIGNMENT
+
+
+def _write_all(file_descriptor, data, offset):
+    data = memoryview(data)
+    while len(data) > 0:
+        written_size = os.pwrite(file_descriptor, data, offset)
+        data = data[written_size:]
+        offset += written_size
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Converts images of files and directories to frame store, so repeated runs read frames without decoding
+
+Run from the TVS directory:
+    python3 -m sources.frame_store_converter store.tvsf sources... [--decode-mode mode]
+"""
+import argparse
+import os
+import sys
+from sources.image_source import ImageSource, COLOR_DECODE_MODE, DECODE_MODES
+from sources.frame_store import FrameStoreWriter, is_frame_store
+
+
+def convert_images_to_frame_store(sources, store_path, decode_mode=COLOR_DECODE_MODE, is_recursive=False):
+    """Decodes images of sources to new store (frames are named by paths), returns count of frames"""
+    if not is_frame_store(store_path):
+        raise ValueError(f"Frame store path should have .tvsf extension: {store_path}")
+
+    image_source = ImageSource(sources, decode_mode, is_recursive=is_recursive)
+    frames_count = 0
+    with FrameStoreWriter(store_path, is_appending=False) as frame_store_writer:
+        for image_path in image_source.image_paths():
+            # Videos and other stores are not converted, files which are not images are skipped
+            if is_frame_store(image_path) or not os.path.isfile(image_path):
+                continue
+            image = image_source.read(image_path)
+            if image is not None:
+                frame_store_writer.append(image, image_path)
+                frames_count += 1
+    return frames_count
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Converts images to frame store of the System of technical vision.")
+    parser.add_argument("store_path", type=str, help="Path of the new frame store (.tvsf)")
+    parser.add_argument("sources", type=str, nargs="+", help="Image files and directories")
+    parser.add_argument("--decode-mode", type=str, default=COLOR_DECODE_MODE, choices=sorted(DECODE_MODES))
+    parser.add_argument("--recursive", action="store_true", help="Images of subdirectories are converted too")
+    return parser.parse_args()
+
+
+def main():
+    """Converts images and prints count of written frames"""
+    args = _parse_arguments()
+    frames_count = convert_images_to_frame_store(
+        args.sources, args.store_path, args.decode_mode, args.recursive)
+    print(f"{frames_count} frames are written to {args.store_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,337 @@
 #!/usr/bin/python3
-"""Provides generator of images from source paths"""
+"""Provides generator of images from source paths (images, directories, videos, streams and frame stores)"""
+from collections import deque
+from fnmatch import fnmatch
+from multiprocessing.dummy import Pool as ThreadPool
 import cv2
+import json
+import numpy as np
 import os
+import threading
+import time
+from sources.video_source import VideoSource, DEFAULT_FRAMES_BUFFER_SIZE, is_video_source, convert_frame
+from sources.frame_store import FrameReference, is_frame_store, open_frame_store
+
+
+COLOR_DECODE_MODE = "color"
+GRAYSCALE_DECODE_MODE = "grayscale"
+DECODE_MODES = {
+    COLOR_DECODE_MODE: cv2.IMREAD_COLOR,
+    GRAYSCALE_DECODE_MODE: cv2.IMREAD_GRAYSCALE,
+    "reduced_color_2": cv2.IMREAD_REDUCED_COLOR_2,
+    "reduced_color_4": cv2.IMREAD_REDUCED_COLOR_4,
+    "reduced_color_8": cv2.IMREAD_REDUCED_COLOR_8,
+    "reduced_grayscale_2": cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    "reduced_grayscale_4": cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    "reduced_grayscale_8": cv2.IMREAD_REDUCED_GRAYSCALE_8
+}
+
+# Cursor file is rewritten after this count of processed paths and when processing is finished
+CURSOR_SAVE_INTERVAL = 100
 
 
 class ImageSource:
     """Image sources class"""
-    def __init__(self, paths):
+    def __init__(
+            self, paths, decode_mode=COLOR_DECODE_MODE, prefetch_threads_count=0, read_ahead_count=None,
+            is_recursive=False, extensions=None, patterns=None, min_file_size=0, cursor_path=None,
+            frame_stride=1, frames_buffer_size=DEFAULT_FRAMES_BUFFER_SIZE, is_dropping_oldest_frames=False,
+            metrics=None):
         if paths is None or len(paths) == 0:
             raise ValueError("Path list is empty")
+        if decode_mode not in DECODE_MODES:
+            raise ValueError(f"Unsupported decode mode: {decode_mode}")
+        if prefetch_threads_count < 0:
+            raise ValueError("Prefetch threads count should not be negative")
+        if read_ahead_count is not None and read_ahead_count <= 0:
+            raise ValueError("Read-ahead count should be positive")
+        if min_file_size < 0:
+            raise ValueError("Min file size should not be negative")
+        if frame_stride <= 0:
+            raise ValueError("Frame stride should be positive")
+        if frames_buffer_size <= 0:
+            raise ValueError("Frames buffer size should be positive")
+
         self._paths = paths
+        self._decode_mode = decode_mode
+        self._prefetch_threads_count = prefetch_threads_count
+        self._read_ahead_count = read_ahead_count if read_ahead_count is not None else 2 * prefetch_threads_count
+        self._is_recursive = is_recursive
+        self._extensions = _normalize_extensions(extensions) if extensions is not None else None
+        self._patterns = patterns
+        self._min_file_size = min_file_size
+        self._cursor_path = cursor_path
+        self._frame_stride = frame_stride
+        self._frames_buffer_size = frames_buffer_size
+        self._is_dropping_oldest_frames = is_dropping_oldest_frames
+        self._metrics = metrics
+        self._progress = None
 
     def images(self):
-        """Reads images from paths"""
-        for path in self._paths:
-            if os.path.isdir(path):
-                for image in self._images_from_dir(path):
-                    yield image
+        """Reads images from paths and frames of videos (in background threads if prefetching is enabled)"""
+        items = self.items()
+        read_items = self._prefetched_images(items) if self._prefetch_threads_count > 0 else\
+            map(self._read_item_pair, items)
+
+        for item, image in read_items:
+            if image is None:
+                self.complete(item)
+                continue
+            # Cursor is advanced by processed images, so they replace their items
+            if self._progress is not None:
+                self._progress.replace_item(item, image)
+            yield image
+
+    def items(self):
+        """Lists paths of image files, decoded frames of videos and streams and references to frames of stores
+
+        Videos are decoded by background thread with bounded buffer, so frames are yielded as images.
+        Frames of stores are yielded as references, so they are mapped by workers without copying.
+        If cursor path is set, processed items should be passed to complete().
+        """
+        self._progress = _CursorProgress(self._save_cursor) if self._cursor_path is not None else None
+        for cursor, image_path in self._cursor_paths():
+            if self._progress is None:
+                for item in self._path_items(image_path):
+                    yield item
+                continue
+
+            path_sequence = self._progress.add_path(cursor)
+            for item in self._path_items(image_path):
+                self._progress.add_item(item, path_sequence)
+                yield item
+            self._progress.finish_path(path_sequence)
+
+    def complete(self, item):
+        """Marks item of items() or image of images() as processed (items may be processed in any order)"""
+        if self._progress is not None:
+            self._progress.complete(item)
+
+    def save_cursor(self):
+        """Saves cursor after the last path whose items are all processed, called when processing is finished
+
+        Cursor is saved by CURSOR_SAVE_INTERVAL processed paths too, so failed or killed run
+        is resumed from the first path which is not processed.
+        """
+        if self._progress is not None:
+            self._progress.save()
+
+    def read_item(self, item):
+        """Reads image from item of items(), decoded frames are returned as is"""
+        if isinstance(item, FrameReference):
+            return self._measured_read(self.read_frame, item)
+        return self.read(item) if isinstance(item, str) else item
+
+    def image_paths(self):
+        """Lists candidate image files from paths without reading them
+
+        Directories are listed in sorted order (recursively if enabled), files are filtered
+        by extensions, patterns and min size. If cursor path is set, listing continues
+        after the last path processed by previous run.
+        """
+        for _, image_path in self._cursor_paths():
+            yield image_path
+
+    def _cursor_paths(self):
+        # Yields image paths with cursors which point to them
+        previous_cursor = self._load_cursor()
+
+        for source_index, path in enumerate(self._paths):
+            cursor_components = None
+            if previous_cursor is not None:
+                if source_index < previous_cursor["source_index"]:
+                    continue
+                if source_index == previous_cursor["source_index"]:
+                    cursor_components = _path_components(os.path.relpath(previous_cursor["path"], path))
+
+            if is_video_source(path):
+                image_paths = [path] if cursor_components is None else []
+            elif os.path.isdir(path):
+                image_paths = self._image_paths_from_dir(path, cursor_components)
             else:
-                image = cv2.imread(path)
-                if image is not None:
-                    yield image
-
-    def _images_from_dir(self, dir_path):
-        for filename in os.listdir(dir_path):
-            image = cv2.imread(os.path.join(dir_path, filename))
-            if image is not None:
-                yield image
+                image_paths = [path] if cursor_components is None else []
+
+            for image_path in image_paths:
+                yield {"source_index": source_index, "path": image_path}, image_path
+
+    def _path_items(self, image_path):
+        if is_video_source(image_path):
+            video_source = VideoSource(
+                image_path,
+                self._decode_mode,
+                self._frame_stride,
+                self._frames_buffer_size,
+                self._is_dropping_oldest_frames)
+            for frame in video_source.frames():
+                yield frame
+        elif is_frame_store(image_path):
+            for frame_index in range(len(open_frame_store(image_path))):
+                yield FrameReference(image_path, frame_index)
+        else:
+            yield image_path
+
+    def read(self, image_path):
+        """Reads single image in decode mode of the source, returns None if file is not an image"""
+        return self._measured_read(self.read_image, image_path)
+
+    @staticmethod
+    def read_image(image_path, decode_mode=COLOR_DECODE_MODE):
+        """Reads single image, returns None if file is not an image"""
+        return cv2.imread(image_path, DECODE_MODES[decode_mode])
+
+    @staticmethod
+    def read_frame(frame_reference, decode_mode=COLOR_DECODE_MODE):
+        """Returns frame of store as view of its memory map (converted copy for other decode modes)"""
+        frame_store = open_frame_store(frame_reference.store_path)
+        return convert_frame(frame_store.frame(frame_reference.frame_index), decode_mode)
+
+    @staticmethod
+    def decode_image(image_bytes, decode_mode=COLOR_DECODE_MODE):
+        """Decodes image from content of image file, returns None if it is not an image"""
+        return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), DECODE_MODES[decode_mode])
+
+    def _measured_read(self, read_function, item):
+        if self._metrics is None:
+            return read_function(item, self._decode_mode)
+
+        started_time = time.perf_counter()
+        image = read_function(item, self._decode_mode)
+        self._metrics.record("decode", time.perf_counter() - started_time)
+        return image
+
+    def _read_item_pair(self, item):
+        return item, self.read_item(item)
+
+    def _prefetched_images(self, items):
+        # Decoding runs ahead of the consumer by at most read-ahead count images, order of images is kept
+        with ThreadPool(self._prefetch_threads_count) as pool:
+            pending_images = deque()
+            for item in items:
+                pending_images.append(pool.apply_async(self._read_item_pair, (item,)))
+                if len(pending_images) >= self._read_ahead_count:
+                    yield pending_images.popleft().get()
+
+            while pending_images:
+                yield pending_images.popleft().get()
+
+    def _image_paths_from_dir(self, dir_path, cursor_components=None):
+        with os.scandir(dir_path) as directory_entries:
+            entries = sorted(directory_entries, key=lambda entry: entry.name)
+
+        for entry in entries:
+            # Entries before the cursor were listed by previous run, only the cursor branch is entered
+            if cursor_components is not None:
+                if entry.name < cursor_components[0]:
+                    continue
+                if entry.name == cursor_components[0]:
+                    if len(cursor_components) > 1 and entry.is_dir():
+                        for image_path in self._image_paths_from_dir(entry.path, cursor_components[1:]):
+                            yield image_path
+                    cursor_components = None
+                    continue
+                cursor_components = None
+
+            if entry.is_dir():
+                if self._is_recursive:
+                    for image_path in self._image_paths_from_dir(entry.path):
+                        yield image_path
+            elif self._is_acceptable_file(entry):
+                yield entry.path
+
+    def _is_acceptable_file(self, entry):
+        if self._extensions is not None and os.path.splitext(entry.name)[1].lower() not in self._extensions:
+            return False
+        if self._patterns is not None and not any(fnmatch(entry.name, pattern) for pattern in self._patterns):
+            return False
+        return self._min_file_size == 0 or entry.stat().st_size >= self._min_file_size
+
+    def _load_cursor(self):
+        if self._cursor_path is None or not os.path.exists(self._cursor_path):
+            return None
+        with open(self._cursor_path) as cursor_file:
+            return json.load(cursor_file)
+
+    def _save_cursor(self, cursor):
+        if self._cursor_path is None:
+            return
+        temporary_cursor_path = self._cursor_path + ".tmp"
+        with open(temporary_cursor_path, "w") as cursor_file:
+            json.dump(cursor, cursor_file)
+        os.replace(temporary_cursor_path, self._cursor_path)
+
+
+class _CursorProgress:
+    """Processing state of listed paths, cursor is the last path of the longest processed prefix of them
+
+    Items are tracked by identity, every path is processed when it is listed completely
+    and all its items are processed.
+    """
+    def __init__(self, save_function):
+        self._save_function = save_function
+        self._lock = threading.Lock()
+        # Path sequence -> [cursor, count of items in flight (+1 while the path is listed)]
+        self._paths = {}
+        # Id of item -> (item, sequences of its paths), items are kept, so their ids are not reused
+        self._items = {}
+        self._listed_paths_count = 0
+        self._processed_paths_count = 0
+        self._cursor = None
+        self._is_saved = True
+
+    def add_path(self, cursor):
+        with self._lock:
+            path_sequence = self._listed_paths_count
+            self._listed_paths_count += 1
+            self._paths[path_sequence] = [cursor, 1]
+            return path_sequence
+
+    def add_item(self, item, path_sequence):
+        with self._lock:
+            self._paths[path_sequence][1] += 1
+            self._items.setdefault(id(item), (item, deque()))[1].append(path_sequence)
+
+    def replace_item(self, item, new_item):
+        with self._lock:
+            path_sequence = self._pop_item(item)
+            self._items.setdefault(id(new_item), (new_item, deque()))[1].append(path_sequence)
+
+    def finish_path(self, path_sequence):
+        with self._lock:
+            self._release_path(path_sequence)
+
+    def complete(self, item):
+        with self._lock:
+            self._release_path(self._pop_item(item))
+
+    def save(self):
+        with self._lock:
+            if not self._is_saved:
+                self._save_function(self._cursor)
+                self._is_saved = True
+
+    def _pop_item(self, item):
+        _, paths_sequences = self._items[id(item)]
+        path_sequence = paths_sequences.popleft()
+        if not paths_sequences:
+            del self._items[id(item)]
+        return path_sequence
+
+    def _release_path(self, path_sequence):
+        self._paths[path_sequence][1] -= 1
+        while self._processed_paths_count in self._paths and self._paths[self._processed_paths_count][1] == 0:
+            self._cursor = self._paths.pop(self._processed_paths_count)[0]
+            self._processed_paths_count += 1
+            self._is_saved = False
+            if self._processed_paths_count % CURSOR_SAVE_INTERVAL == 0:
+                self._save_function(self._cursor)
+                self._is_saved = True
+
+
+def _normalize_extensions(extensions):
+    return {
+        extension.lower() if extension.startswith(".") else "." + extension.lower()
+        for extension in extensions}
+
+
+def _path_components(path):
+    return os.path.normpath(path).split(os.sep)
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+"""Provides generator of frames from video files and streams"""
+import threading
+from collections import deque
+import cv2
+
+
+VIDEO_EXTENSIONS = {".avi", ".mp4", ".m4v", ".mov", ".mkv", ".mpg", ".mpeg", ".wmv", ".webm"}
+DEFAULT_FRAMES_BUFFER_SIZE = 32
+
+# Decode modes of still images which are applied to decoded frames: (is grayscale, reduction factor)
+_FRAME_DECODE_MODES = {
+    "color": (False, 1),
+    "grayscale": (True, 1),
+    "reduced_color_2": (False, 2),
+    "reduced_color_4": (False, 4),
+    "reduced_color_8": (False, 8),
+    "reduced_grayscale_2": (True, 2),
+    "reduced_grayscale_4": (True, 4),
+    "reduced_grayscale_8": (True, 8)
+}
+
+
+def convert_frame(frame, decode_mode):
+    """Applies decode mode to raw frame (frame is returned as is if it needs no conversion)"""
+    is_grayscale, reduction_factor = _FRAME_DECODE_MODES[decode_mode]
+    if is_grayscale and frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if reduction_factor > 1:
+        height, width = frame.shape[:2]
+        frame = cv2.resize(
+            frame,
+            (width // reduction_factor, height // reduction_factor),
+            interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def is_video_source(path):
+    """Checks that path is a video file or a stream URI (rtsp://, http:// and others)"""
+    return "://" in path or path.lower().endswith(tuple(VIDEO_EXTENSIONS))
+
+
+class VideoSource:
+    """Decodes frames of video in background thread to bounded buffer
+
+    If processing falls behind and dropping is enabled, the oldest buffered frames are dropped,
+    otherwise decoding waits for free space in the buffer.
+    """
+    def __init__(
+            self, uri, decode_mode="color", frame_stride=1,
+            buffer_size=DEFAULT_FRAMES_BUFFER_SIZE, is_dropping_oldest=False):
+        if decode_mode not in _FRAME_DECODE_MODES:
+            raise ValueError(f"Unsupported decode mode: {decode_mode}")
+        if frame_stride <= 0:
+            raise ValueError("Frame stride should be positive")
+        if buffer_size <= 0:
+            raise ValueError("Frames buffer size should be positive")
+
+        self._uri = uri
+        self._decode_mode = decode_mode
+        self._frame_stride = frame_stride
+        self._buffer_size = buffer_size
+        self._is_dropping_oldest = is_dropping_oldest
+        self._dropped_frames_count = 0
+
+    @property
+    def dropped_frames_count(self):
+        """Count of frames dropped because processing fell behind decoding"""
+        return self._dropped_frames_count
+
+    def frames(self):
+        """Yields decoded frames (every frame_stride-th one), raises ValueError if video can not be opened"""
+        capture = cv2.VideoCapture(self._uri)
+        if not capture.isOpened():
+            capture.release()
+            raise ValueError(f"Video can not be opened: {self._uri}")
+
+        frames = deque()
+        condition = threading.Condition()
+        state = {"is_finished": False, "is_stopped": False, "error": None}
+        decode_thread = threading.Thread(
+            target=self._decode_frames,
+            args=(capture, frames, condition, state),
+            daemon=True)
+        decode_thread.start()
+
+        try:
+            while True:
+                with condition:
+                    while not frames and not state["is_finished"]:
+                        condition.wait()
+                    if not frames:
+                        break
+                    frame = frames.popleft()
+                    condition.notify_all()
+                yield frame
+        finally:
+            with condition:
+                state["is_stopped"] = True
+                condition.notify_all()
+            decode_thread.join()
+            capture.release()
+
+        if state["error"] is not None:
+            raise state["error"]
+
+    def _decode_frames(self, capture, frames, condition, state):
+        try:
+            frame_index = 0
+            while True:
+                # Skipped frames are only grabbed, they are not converted to images
+                if not capture.grab():
+                    break
+                frame_index += 1
+                if (frame_index - 1) % self._frame_stride != 0:
+                    continue
+
+                is_retrieved, frame = capture.retrieve()
+                if not is_retrieved:
+                    break
+                frame = convert_frame(frame, self._decode_mode)
+
+                with condition:
+                    while len(frames) >= self._buffer_size and not self._is_dropping_oldest\
+                            and not state["is_stopped"]:
+                        condition.wait()
+                    if state["is_stopped"]:
+                        return
+                    if len(frames) >= self._buffer_size:
+                        frames.popleft()
+                        self._dropped_frames_count += 1
+                    frames.append(frame)
+                    condition.notify_all()
+        except Exception as error:
+            state["error"] = error
+        finally:
+            with condition:
+                state["is_finished"] = True
+                condition.notify_all()
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""Tests of writing and reading of frame stores"""
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from sources.frame_store import FrameStore, FrameStoreWriter, open_frame_store, merge_process_stores
+from tvs_builder import TechnicalVisionSystemBuilder
+
+
+def _test_frames():
+    random_generator = np.random.default_rng(25)
+    return [
+        ("color", (random_generator.random((31, 17, 3)) * 255).astype(np.uint8)),
+        ("gray", (random_generator.random((5, 7)) * 255).astype(np.uint8)),
+        ("float", random_generator.random((3, 4)).astype(np.float32)),
+        ("strided", (random_generator.random((20, 20, 3)) * 255).astype(np.uint8)[::2, 1::3])]
+
+
+class FrameStoreTest(unittest.TestCase):
+    """Frames read from store are equal to written frames"""
+    def setUp(self):
+        self._directory_path = tempfile.mkdtemp()
+        self._store_path = os.path.join(self._directory_path, "frames.tvsf")
+
+    def tearDown(self):
+        shutil.rmtree(self._directory_path)
+
+    def assert_frames(self, frame_store, expected_frames):
+        self.assertEqual(len(frame_store), len(expected_frames))
+        for frame_index, (name, expected_frame) in enumerate(expected_frames):
+            frame = frame_store.frame(frame_index)
+            self.assertEqual(frame_store.name(frame_index), name)
+            self.assertEqual(frame.dtype, expected_frame.dtype)
+            self.assertTrue(np.array_equal(frame, expected_frame))
+            self.assertFalse(frame.flags.writeable)
+
+    def test_written_frames_are_read(self):
+        frames = _test_frames()
+        with FrameStoreWriter(self._store_path) as frame_store_writer:
+            for name, frame in frames:
+                frame_store_writer.append(frame, name)
+        self.assert_frames(FrameStore(self._store_path), frames)
+
+    def test_appending_continues_store(self):
+        frames = _test_frames()
+        with FrameStoreWriter(self._store_path) as frame_store_writer:
+            for name, frame in frames[:2]:
+                frame_store_writer.append(frame, name)
+        with FrameStoreWriter(self._store_path) as frame_store_writer:
+            for name, frame in frames[2:]:
+                frame_store_writer.append(frame, name)
+        self.assert_frames(FrameStore(self._store_path), frames)
+
+        with FrameStoreWriter(self._store_path, is_appending=False) as frame_store_writer:
+            frame_store_writer.append(frames[3][1], frames[3][0])
+        self.assert_frames(FrameStore(self._store_path), frames[3:])
+
+    def test_frames_of_last_flush_are_read_while_writing(self):
+        frames = _test_frames()
+        frame_store_writer = FrameStoreWriter(self._store_path)
+        self.assert_frames(FrameStore(self._store_path), [])
+        frame_store_writer.append(frames[0][1], frames[0][0])
+        frame_store_writer.flush()
+        # File of interrupted writing contains frames appended after flush, they are not indexed yet
+        for name, frame in frames[1:]:
+            frame_store_writer.append(frame, name)
+        self.assert_frames(FrameStore(self._store_path), frames[:1])
+        frame_store_writer.close()
+        self.assert_frames(FrameStore(self._store_path), frames)
+
+    def test_damaged_file_is_not_read(self):
+        with open(self._store_path, "wb") as store_file:
+            store_file.write(b"TVSF")
+        with self.assertRaises(ValueError):
+            FrameStore(self._store_path)
+
+    def test_changed_store_is_opened_again(self):
+        frames = _test_frames()
+        with FrameStoreWriter(self._store_path) as frame_store_writer:
+            frame_store_writer.append(frames[0][1], frames[0][0])
+        self.assertIs(open_frame_store(self._store_path), open_frame_store(self._store_path))
+        with FrameStoreWriter(self._store_path) as frame_store_writer:
+            frame_store_writer.append(frames[1][1], frames[1][0])
+        self.assert_frames(open_frame_store(self._store_path), frames[:2])
+
+    def test_process_stores_are_merged(self):
+        frames = _test_frames()
+        for process_id, (name, frame) in zip((101, 102), frames[:2]):
+            with FrameStoreWriter(os.path.join(self._directory_path, f"frames.{process_id}.tvsf")) as writer:
+                writer.append(frame, name)
+        self.assertEqual(merge_process_stores(self._store_path), 2)
+        self.assertEqual(os.listdir(self._directory_path), ["frames.tvsf"])
+        self.assert_frames(FrameStore(self._store_path), frames[:2])
+
+
+class FrameStoreSourceTest(unittest.TestCase):
+    """Frames of store are processed as the same decoded images"""
+    def setUp(self):
+        self._directory_path = tempfile.mkdtemp()
+        self._images_path = os.path.join(self._directory_path, "images")
+        self._store_path = os.path.join(self._directory_path, "images.tvsf")
+        os.makedirs(self._images_path)
+        random_generator = np.random.default_rng(25)
+        with FrameStoreWriter(self._store_path) as frame_store_writer:
+            for image_index in range(6):
+                image = cv2.GaussianBlur((random_generator.random((48, 64, 3)) * 255).astype(np.uint8), (0, 0), 2)
+                image_path = os.path.join(self._images_path, f"image{image_index}.png")
+                cv2.imwrite(image_path, image)
+                frame_store_writer.append(cv2.imread(image_path), image_path)
+        self._results = []
+
+    def tearDown(self):
+        shutil.rmtree(self._directory_path)
+
+    def _process_result(self, raw_image, processed_image, image_details, detected_elements_descriptions):
+        self._results.append((raw_image.tobytes(), processed_image.tobytes(), repr(image_details)))
+        # High-level processing draws on images, frames of store are not changed
+        raw_image[:] = 0
+
+    def _run(self, source, executor):
+        self._results = []
+        TechnicalVisionSystemBuilder()\
+            .from_sources([source])\
+            .with_filters([
+                {"filter_name": "cv2_gray_filter", "filter_parameters": {}},
+                {"filter_name": "cv2_binarization_filter",
+                    "filter_parameters": {"lower_threshold": 120, "upper_threshold": 255}}])\
+            .with_details_extraction_methods([{"name": "white_area_size", "parameters": {"scale": 1000}}])\
+            .result_processed_by(self._process_result)\
+            .with_executor(executor)\
+            .build()\
+            .start_processing()
+        return sorted(self._results)
+
+    def test_store_results_are_equal_to_images_results(self):
+        expected_results = self._run(self._images_path, "serial")
+        self.assertEqual(len(expected_results), 6)
+        for executor in ("serial", "thread", "pipeline"):
+            self.assertEqual(self._run(self._store_path, executor), expected_results, executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""Tests of resuming of sources processing from cursor"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import cv2
+import numpy as np
+import sources.image_source as image_source_module
+from sources.image_source import ImageSource
+from tvs_builder import TechnicalVisionSystemBuilder
+
+
+IMAGES_COUNT = 12
+
+
+class CursorResumeTest(unittest.TestCase):
+    """Resumed run processes the images which are not processed by failed run"""
+    def setUp(self):
+        self._directory_path = tempfile.mkdtemp()
+        self._sources_path = os.path.join(self._directory_path, "sources")
+        self._cursor_path = os.path.join(self._directory_path, "cursor.json")
+        # Every image is filled by own value, so processed images are known by their pixels
+        for image_index in range(IMAGES_COUNT):
+            image_path = os.path.join(self._sources_path, f"part{image_index // 5}", f"image{image_index:02}.png")
+            os.makedirs(os.path.dirname(image_path), exist_ok=True)
+            cv2.imwrite(image_path, np.full((16, 16, 3), 10 * (image_index + 1), np.uint8))
+        self._processed_images = []
+        self._failed_image_index = None
+
+    def tearDown(self):
+        shutil.rmtree(self._directory_path)
+
+    def _process_result(self, raw_image, processed_image, image_details, detected_elements_descriptions):
+        image_index = int(raw_image[0, 0, 0]) // 10 - 1
+        if image_index == self._failed_image_index:
+            raise RuntimeError("Image can not be processed")
+        self._processed_images.append(image_index)
+
+    def _run(self, executor):
+        self._processed_images = []
+        TechnicalVisionSystemBuilder()\
+            .from_sources([self._sources_path])\
+            .with_sources_scanning(is_recursive=True)\
+            .resuming_from_cursor(self._cursor_path)\
+            .with_filters([{"filter_name": "cv2_gray_filter", "filter_parameters": {}}])\
+            .result_processed_by(self._process_result)\
+            .with_executor(executor)\
+            .with_workers_count(3)\
+            .build()\
+            .start_processing()
+        return sorted(self._processed_images)
+
+    def assert_resumed(self, executor):
+        all_images = list(range(IMAGES_COUNT))
+        self.assertEqual(self._run(executor), all_images)
+        self.assertEqual(self._run(executor), [])
+
+        os.remove(self._cursor_path)
+        self._failed_image_index = 7
+        with mock.patch.object(image_source_module, "CURSOR_SAVE_INTERVAL", 1):
+            with self.assertRaises(RuntimeError):
+                self._run(executor)
+            failed_run_images = self._processed_images
+            self.assertNotIn(7, failed_run_images)
+            self.assertIn(0, failed_run_images)
+
+            self._failed_image_index = None
+            resumed_run_images = self._run(executor)
+            # Images processed by both runs are only images after the first failed one
+            self.assertEqual(sorted(set(failed_run_images) | set(resumed_run_images)), all_images)
+            self.assertTrue(all(image_index > 7 for image_index in set(failed_run_images) & set(resumed_run_images)))
+            self.assertEqual(self._run(executor), [])
+
+    def test_serial_executor(self):
+        self.assert_resumed("serial")
+
+    def test_thread_executor(self):
+        self.assert_resumed("thread")
+
+    def test_pipeline_executor(self):
+        self.assert_resumed("pipeline")
+
+    def test_cursor_waits_for_previous_items(self):
+        image_source = ImageSource([self._sources_path], is_recursive=True, cursor_path=self._cursor_path)
+        items = list(image_source.items())
+        # Items completed after not processed item do not advance cursor
+        for item in items[:3] + items[4:9]:
+            image_source.complete(item)
+        image_source.save_cursor()
+
+        resumed_source = ImageSource([self._sources_path], is_recursive=True, cursor_path=self._cursor_path)
+        self.assertEqual(list(resumed_source.image_paths()), items[3:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""Tests of invalidation of results cache"""
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from tvs_builder import TechnicalVisionSystemBuilder
+from tvs_cache import settings_fingerprint
+
+
+TVS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCES_PATH = os.path.join(TVS_PATH, "data", "images", "sources", "russian_plate_numbers")
+TRAINING_FILES_PATH = os.path.join(TVS_PATH, "data", "training_files")
+FILTERS = [{"filter_name": "cv2_gray_filter", "filter_parameters": {}}]
+
+
+class ResultCacheTest(unittest.TestCase):
+    """Cached results are equal to results of processing and are not reused after settings are changed"""
+    def setUp(self):
+        self._directory_path = tempfile.mkdtemp()
+        self._cache_path = os.path.join(self._directory_path, "cache")
+        self._cascade_path = os.path.join(self._directory_path, "cascade.xml")
+        shutil.copy(os.path.join(TRAINING_FILES_PATH, "haar_russian_plate_number.xml"), self._cascade_path)
+        self._results = {}
+
+    def tearDown(self):
+        shutil.rmtree(self._directory_path)
+
+    def _detection_methods(self, method_name="plate_number_detection_method"):
+        return [{"name": method_name, "parameters": {"plate_cascade_path": self._cascade_path}}]
+
+    def _process_result(self, raw_image, processed_image, image_details, detected_elements_descriptions):
+        image_key = hashlib.sha256(raw_image.tobytes()).hexdigest()
+        self._results[image_key] = (repr(image_details), repr(list(detected_elements_descriptions)))
+
+    def _run(self, detection_methods, is_cached=True):
+        self._results = {}
+        builder = TechnicalVisionSystemBuilder()\
+            .from_sources([SOURCES_PATH])\
+            .with_filters(FILTERS)\
+            .with_details_extraction_methods([{"name": "white_area_size", "parameters": {"scale": 1000}}])\
+            .with_detection_methods(detection_methods)\
+            .result_processed_by(self._process_result)
+        if is_cached:
+            builder.with_result_cache(self._cache_path)
+        builder.build().start_processing()
+        return self._results
+
+    def _cached_results_count(self):
+        return len(os.listdir(self._cache_path)) if os.path.exists(self._cache_path) else 0
+
+    def test_cached_results_are_equal_to_processed_results(self):
+        expected_results = self._run(self._detection_methods(), is_cached=False)
+        self.assertTrue(any(descriptions != "[]" for _, descriptions in expected_results.values()))
+
+        self.assertEqual(self._run(self._detection_methods()), expected_results)
+        cached_results_count = self._cached_results_count()
+        self.assertEqual(cached_results_count, len(expected_results))
+        self.assertEqual(self._run(self._detection_methods()), expected_results)
+        self.assertEqual(self._cached_results_count(), cached_results_count)
+
+    def test_replaced_cascade_invalidates_results(self):
+        self._run(self._detection_methods())
+        cached_results_count = self._cached_results_count()
+
+        shutil.copy(os.path.join(TRAINING_FILES_PATH, "haar_frontalface.xml"), self._cascade_path)
+        expected_results = self._run(self._detection_methods(), is_cached=False)
+        self.assertEqual(self._run(self._detection_methods()), expected_results)
+        self.assertEqual(self._cached_results_count(), 2 * cached_results_count)
+
+    def test_fingerprint(self):
+        detection_methods = self._detection_methods()
+        fingerprint = settings_fingerprint(FILTERS, [], detection_methods, "color")
+        self.assertEqual(settings_fingerprint(FILTERS, [], detection_methods, "color"), fingerprint)
+        self.assertNotEqual(settings_fingerprint(FILTERS, [], detection_methods, "grayscale"), fingerprint)
+        self.assertNotEqual(settings_fingerprint([], [], detection_methods, "color"), fingerprint)
+
+        # Only content of referenced file is a part of fingerprint
+        os.utime(self._cascade_path, (0, 0))
+        self.assertEqual(settings_fingerprint(FILTERS, [], detection_methods, "color"), fingerprint)
+        with open(self._cascade_path, "ab") as cascade_file:
+            cascade_file.write(b"\n")
+        self.assertNotEqual(settings_fingerprint(FILTERS, [], detection_methods, "color"), fingerprint)
+
+    def test_stateful_plan_is_not_cached(self):
+        detection_methods = [{
+            "name": "tracking_face_detection_method",
+            "parameters": {"face_cascade_path": os.path.join(TRAINING_FILES_PATH, "haar_frontalface.xml")}}]
+        expected_results = self._run(detection_methods, is_cached=False)
+        self.assertEqual(self._run(detection_methods), expected_results)
+        self.assertEqual(self._cached_results_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
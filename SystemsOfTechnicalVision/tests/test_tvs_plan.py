@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""Tests of fusion of filters in optimized execution plans"""
+import unittest
+import cv2
+import numpy as np
+from tvs_buffers import FrameBuffers
+from tvs_plan import compile_plan, compile_filters_tree, optimize_filters_chain
+
+
+def _filter(filter_name, **filter_parameters):
+    return {"filter_name": filter_name, "filter_parameters": filter_parameters}
+
+
+def _apply_filters(plan, image, buffers=None):
+    for _, filter_function in plan.filters:
+        image = filter_function(image, buffers)
+    return image.copy()
+
+
+def _test_image():
+    random_generator = np.random.default_rng(6)
+    image = (random_generator.random((240, 320, 3)) * 255).astype(np.uint8)
+    return cv2.GaussianBlur(image, (0, 0), 3)
+
+
+class FiltersFusionTest(unittest.TestCase):
+    """Optimized plan gives the same images as plan of every filter"""
+    def assert_same_result(self, filters, fused_filters_count):
+        self.assertEqual(len(optimize_filters_chain(filters)), fused_filters_count)
+        image = _test_image()
+        expected_image = _apply_filters(compile_plan(filters, [], []), image)
+        optimized_plan = compile_plan(filters, [], [], is_optimized=True)
+        self.assertTrue(np.array_equal(_apply_filters(optimized_plan, image), expected_image))
+        # In-place application to worker buffers does not change the source image and the result
+        source_image = image.copy()
+        self.assertTrue(np.array_equal(_apply_filters(optimized_plan, image, FrameBuffers()), expected_image))
+        self.assertTrue(np.array_equal(image, source_image))
+
+    def test_dilate_iterations_are_summed(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_binarization_filter", lower_threshold=120, upper_threshold=255),
+                _filter("cv2_dilate_filter", iterations_count=2),
+                _filter("cv2_dilate_filter", iterations_count=3)],
+            3)
+
+    def test_erode_iterations_are_summed(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_erode_filter", iterations_count=1),
+                _filter("cv2_erode_filter", iterations_count=0),
+                _filter("cv2_erode_filter", iterations_count=4)],
+            2)
+
+    def test_dilate_and_erode_are_not_fused(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_dilate_filter", iterations_count=2),
+                _filter("cv2_erode_filter", iterations_count=2)],
+            3)
+
+    def test_overlapping_binarizations_are_fused(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_binarization_filter", lower_threshold=100, upper_threshold=200),
+                _filter("cv2_binarization_filter", lower_threshold=150, upper_threshold=255)],
+            2)
+
+    def test_binarization_above_upper_value_gives_black_image(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_binarization_filter", lower_threshold=100, upper_threshold=150),
+                _filter("cv2_binarization_filter", lower_threshold=150, upper_threshold=255)],
+            2)
+
+    def test_binarization_with_other_upper_value_is_fused(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_binarization_filter", lower_threshold=100, upper_threshold=150),
+                _filter("cv2_binarization_filter", lower_threshold=50, upper_threshold=200)],
+            2)
+
+    def test_binarization_below_lower_threshold_is_not_fused(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_binarization_filter", lower_threshold=200, upper_threshold=255),
+                _filter("cv2_binarization_filter", lower_threshold=50, upper_threshold=100)],
+            3)
+
+    def test_shipped_chain(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_binarization_filter", lower_threshold=115, upper_threshold=255),
+                _filter("cv2_blur_filter", radius=9),
+                _filter("cv2_dilate_filter", iterations_count=5),
+                _filter("cv2_binarization_filter", lower_threshold=125, upper_threshold=255)],
+            5)
+
+    def test_filters_tree_applies_fused_chains(self):
+        chains = [
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_dilate_filter", iterations_count=1),
+                _filter("cv2_dilate_filter", iterations_count=2)],
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_dilate_filter", iterations_count=1),
+                _filter("cv2_dilate_filter", iterations_count=2),
+                _filter("cv2_erode_filter", iterations_count=1)]]
+        image = _test_image()
+        results = {}
+
+        def _apply_node(node, node_image):
+            for chain_index in node.chains_indices:
+                results[chain_index] = node_image
+            for child in node.children.values():
+                _apply_node(child, child.filter_function(node_image, None))
+
+        root = compile_filters_tree(chains, is_optimized=True)
+        _apply_node(root, image)
+        self.assertEqual(len(root.children), 1)
+        for chain_index, filters in enumerate(chains):
+            expected_image = _apply_filters(compile_plan(filters, [], []), image)
+            self.assertTrue(np.array_equal(results[chain_index], expected_image))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""Tests of filtering of large images by overlapping strips"""
+import unittest
+import cv2
+import numpy as np
+from tvs_plan import compile_plan
+from tvs_tiles import StripsExecutor, filters_chain_halo
+
+
+def _filter(filter_name, **filter_parameters):
+    return {"filter_name": filter_name, "filter_parameters": filter_parameters}
+
+
+def _test_image(height, width):
+    random_generator = np.random.default_rng(16)
+    image = (random_generator.random((height, width, 3)) * 255).astype(np.uint8)
+    return cv2.GaussianBlur(image, (0, 0), 5)
+
+
+class StripsExecutorTest(unittest.TestCase):
+    """Stitched strips are equal to the whole filtered image"""
+    def assert_same_result(self, filters, image):
+        plan = compile_plan(filters, [], [], is_optimized=True)
+        expected_image = image
+        for _, filter_function in plan.filters:
+            expected_image = filter_function(expected_image, None)
+
+        halo = filters_chain_halo(filters)
+        source_image = image.copy()
+        # Strips are shorter and longer than halo, the last strip is shorter than others
+        for strip_height in (7, 64, 333):
+            strips_executor = StripsExecutor(strip_height, 3, 0)
+            self.assertTrue(strips_executor.is_applicable(image))
+            result_image = strips_executor.apply(plan.filters, halo, image)
+            self.assertEqual(result_image.dtype, expected_image.dtype)
+            self.assertTrue(np.array_equal(result_image, expected_image), f"Strip height {strip_height}")
+        self.assertTrue(np.array_equal(image, source_image))
+
+    def test_lumbers_chain(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_binarization_filter", lower_threshold=115, upper_threshold=255),
+                _filter("cv2_blur_filter", radius=9),
+                _filter("cv2_dilate_filter", iterations_count=5),
+                _filter("cv2_binarization_filter", lower_threshold=125, upper_threshold=255)],
+            _test_image(1001, 257))
+
+    def test_even_blur_and_morphology_close(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_gray_filter"),
+                _filter("cv2_sobel_filter"),
+                _filter("cv2_blur_filter", radius=6),
+                _filter("cv2_morphology_close_filter", kernel_rectangle_width=5, kernel_rectangle_height=8),
+                _filter("cv2_erode_filter", iterations_count=2)],
+            _test_image(1000, 301))
+
+    def test_color_filters(self):
+        self.assert_same_result(
+            [
+                _filter("cv2_hsv_filter"),
+                _filter("cv2_hsv_color_range_filter", lower_color="0,0,0", upper_color="90,255,200"),
+                _filter("cv2_dilate_filter", iterations_count=3)],
+            _test_image(700, 211))
+
+    def test_unknown_halo(self):
+        self.assertIsNone(filters_chain_halo([_filter("test_filter_1")]))
+
+    def test_small_image_is_not_applicable(self):
+        strips_executor = StripsExecutor(64, 2, 1000 * 1000)
+        self.assertFalse(strips_executor.is_applicable(_test_image(100, 100)))
+        self.assertFalse(StripsExecutor(128, 2, 0).is_applicable(_test_image(128, 100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,35 +1,221 @@
 #!/usr/bin/python3
 """System of technical vision class defenition"""
+import functools
 import multiprocessing
+import time
 import uuid
 from multiprocessing.dummy import Pool as ThreadPool
-from high_level_processing.common import save_filtered_image
-from sources.image_source import ImageSource
-from tvs_mappers import FILTER_MAPPING,\
-    DETAILS_EXTRACTION_METHODS,\
-    DETECTION_METHODS
+from high_level_processing.common import save_filtered_image,\
+    configure_result_writer,\
+    get_result_writer_settings,\
+    flush_results
+from sources.image_source import ImageSource, COLOR_DECODE_MODE, GRAYSCALE_DECODE_MODE
+from sources.frame_store import FrameReference, release_frame_stores
+from tvs_scheduler import run_bounded
+from tvs_executors import run_on_process_pool,\
+    SERIAL_EXECUTOR,\
+    THREAD_EXECUTOR,\
+    PROCESS_EXECUTOR,\
+    PIPELINE_EXECUTOR,\
+    EXECUTORS
+from detection.cascade_registry import get_cascades_generation, sync_cascades_generation
+from tvs_pipeline import StagedPipeline
+from tvs_plan import compile_plan, compile_filters_tree, is_stateful_plan
+from tvs_buffers import get_worker_buffers
+from tvs_cache import ResultCache, settings_fingerprint
+from tvs_tiles import StripsExecutor, filters_chain_halo
+from tvs_profiling import SamplingProfiler, DEFAULT_SAMPLE_INTERVAL
+from tvs_batches import pointwise_prefix_length,\
+    split_to_batches,\
+    group_by_format,\
+    stack_frames,\
+    unstack_frames,\
+    DEFAULT_MAX_BATCHED_FRAME_PIXELS
+from tvs_metrics import Metrics,\
+    DECODE_METRIC,\
+    FILTERS_METRIC,\
+    FILTER_METRIC_PREFIX,\
+    DETAILS_EXTRACTION_METRIC,\
+    DETECTION_METRIC,\
+    HIGH_LEVEL_PROCESSING_METRIC,\
+    IMAGE_METRIC
+
+
+ACQUISITION_STAGE = "acquisition"
+FILTERS_STAGE = "filters"
+DETAILS_EXTRACTION_STAGE = "details_extraction"
+DETECTION_STAGE = "detection"
+HIGH_LEVEL_PROCESSING_STAGE = "high_level_processing"
+PIPELINE_STAGES = (
+    ACQUISITION_STAGE,
+    FILTERS_STAGE,
+    DETAILS_EXTRACTION_STAGE,
+    DETECTION_STAGE,
+    HIGH_LEVEL_PROCESSING_STAGE)
+
+# Decode mode which reads grayscale images when filters chain starts with gray filter
+AUTO_DECODE_MODE = "auto"
 
 
 class TechnicalVisionSystem:
     """TVS class"""
     def __init__(self):
-        self._is_parallel_processing = False
+        self._executor = SERIAL_EXECUTOR
+        self._workers_count = None
+        self._queue_depth = None
+        self._pipeline_stages_workers = {}
         self._is_intermediate_results_saves = False
+        self._decode_mode = COLOR_DECODE_MODE
+        self._prefetch_threads_count = 0
+        self._read_ahead_count = None
+        self._sources_scanning_settings = {}
+        self._result_writer_settings = {}
+        self._result_cache_settings = None
+        self._result_cache = None
+        self._settings_fingerprint = None
         self._sources = []
         self._filters = []
         self._detail_extraction_methods = []
         self._detection_methods = []
-        self._result_processing_function = lambda image, image_data: image
+        self._plan = None
+        self._joint_systems = []
+        self._worker_pool = None
+        self._tiling_settings = None
+        self._strips_executor = None
+        self._filters_halo = None
+        self._metrics = None
+        self._is_timings_collected = False
+        self._profiling_settings = None
+        self._profiler = None
+        self._batch_size = None
+        self._max_batched_frame_pixels = DEFAULT_MAX_BATCHED_FRAME_PIXELS
+        self._batched_filters_count = 0
+        self._filters_tree = None
+        self._result_processing_function = _skip_result_processing
         self._preprocessing_function = None
 
     @property
     def is_parrallel_processing(self):
         """Determines way of sources processing (parallel or sequential)"""
-        return self._is_parallel_processing
+        return self._executor != SERIAL_EXECUTOR
 
     @is_parrallel_processing.setter
     def is_parrallel_processing(self, value):
-        self._is_parallel_processing = value
+        self._executor = THREAD_EXECUTOR if value else SERIAL_EXECUTOR
+
+    @property
+    def executor(self):
+        """Determines executor of sources processing (serial, thread, process or pipeline)"""
+        return self._executor
+
+    @executor.setter
+    def executor(self, value):
+        if value not in EXECUTORS:
+            raise ValueError(f"Unsupported executor: {value}")
+        self._executor = value
+
+    @property
+    def workers_count(self):
+        """Determines count of parallel workers (CPU count by default)"""
+        return self._workers_count if self._workers_count is not None else multiprocessing.cpu_count()
+
+    @workers_count.setter
+    def workers_count(self, value):
+        if value is not None and value <= 0:
+            raise ValueError("Workers count should be positive")
+        self._workers_count = value
+
+    @property
+    def queue_depth(self):
+        """Determines max count of images in flight (twice workers count by default)"""
+        return self._queue_depth if self._queue_depth is not None else 2 * self.workers_count
+
+    @queue_depth.setter
+    def queue_depth(self, value):
+        if value is not None and value <= 0:
+            raise ValueError("Queue depth should be positive")
+        self._queue_depth = value
+
+    @property
+    def pipeline_stages_workers(self):
+        """Determines workers count of pipeline stages (workers count by default)"""
+        return {
+            stage_name: self._pipeline_stages_workers.get(stage_name, self.workers_count)
+            for stage_name in PIPELINE_STAGES}
+
+    @pipeline_stages_workers.setter
+    def pipeline_stages_workers(self, value):
+        for stage_name, workers_count in value.items():
+            if stage_name not in PIPELINE_STAGES:
+                raise ValueError(f"Unknown pipeline stage: {stage_name}")
+            if workers_count <= 0:
+                raise ValueError(f"Workers count of {stage_name} stage should be positive")
+        self._pipeline_stages_workers = dict(value)
+
+    @property
+    def decode_mode(self):
+        """Determines decode mode of source images (color, grayscale, reduced_* or auto)"""
+        return self._decode_mode
+
+    @decode_mode.setter
+    def decode_mode(self, value):
+        self._decode_mode = value
+
+    def set_prefetching(self, threads_count, read_ahead_count=None):
+        """Enables decoding of source images in background threads ahead of processing"""
+        self._prefetch_threads_count = threads_count
+        self._read_ahead_count = read_ahead_count
+
+    def set_sources_scanning(self, is_recursive=False, extensions=None, patterns=None, min_file_size=0):
+        """Determines how source directories are listed and which files are read"""
+        self._sources_scanning_settings.update(
+            is_recursive=is_recursive,
+            extensions=extensions,
+            patterns=patterns,
+            min_file_size=min_file_size)
+
+    def set_sources_cursor(self, cursor_path):
+        """Enables resuming of sources listing from cursor file saved by previous run"""
+        self._sources_scanning_settings.update(cursor_path=cursor_path)
+
+    def set_video_frames_reading(
+            self, frame_stride=1, frames_buffer_size=None, is_dropping_oldest_frames=False):
+        """Determines which frames of video sources are processed and how decoded frames are buffered"""
+        self._sources_scanning_settings.update(
+            frame_stride=frame_stride,
+            is_dropping_oldest_frames=is_dropping_oldest_frames)
+        if frames_buffer_size is not None:
+            self._sources_scanning_settings.update(frames_buffer_size=frames_buffer_size)
+
+    def set_result_writer_settings(self, settings):
+        """Determines writer threads count, queue depth, image format and encoding quality of results"""
+        self._result_writer_settings = dict(settings)
+
+    def set_result_cache(self, directory_path, max_size_bytes):
+        """Enables cache of details and detection results, cached images skip filters and detection"""
+        self._result_cache_settings = (directory_path, max_size_bytes)
+
+    def set_tiling(self, strip_height, threads_count=None, min_image_pixels=0):
+        """Enables parallel filtering of overlapping strips of images with at least min_image_pixels pixels"""
+        self._tiling_settings = (strip_height, threads_count, min_image_pixels)
+        self._plan = None
+
+    def set_metrics(self, is_enabled=True, stream_path=None):
+        """Enables collection of timings, throughput and queue depths (optionally streamed as JSON lines)"""
+        self._metrics = Metrics(stream_path) if is_enabled else None
+        self._is_timings_collected = is_enabled
+
+    def set_profiling(self, dump_path, sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        """Profiles every sample_interval-th image of every worker, merged cProfile dump is written at end"""
+        self._profiling_settings = (dump_path, sample_interval) if dump_path is not None else None
+
+    def set_batching(self, batch_size, max_frame_pixels=DEFAULT_MAX_BATCHED_FRAME_PIXELS):
+        """Processes images by batches, leading point-wise filters are applied once to equal small images"""
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError("Batch size should be positive")
+        self._batch_size = batch_size
+        self._max_batched_frame_pixels = max_frame_pixels
+        self._plan = None
 
     @property
     def is_intermediate_results_saves(self):
@@ -39,6 +225,12 @@ class TechnicalVisionSystem:
     @is_intermediate_results_saves.setter
     def is_intermediate_results_saves(self, value):
         self._is_intermediate_results_saves = value
+        self._plan = None
+
+    @property
+    def filters(self):
+        """Filters chain of system (names or filter functions)"""
+        return self._filters
 
     def add_sources(self, sources):
         """Add an image sources to system"""
@@ -51,6 +243,7 @@ class TechnicalVisionSystem:
         """Add a image filters to system (filter_name, parameters)"""
         if filters is not None:
             self._filters.extend(filters)
+            self._plan = None
         else:
             raise ValueError("Filters are incorrect")
 
@@ -58,6 +251,7 @@ class TechnicalVisionSystem:
         """Add a image details extraction methods to system (method_name, parameters)"""
         if methods is not None:
             self._detail_extraction_methods.extend(methods)
+            self._plan = None
         else:
             raise ValueError("Detail extraction methods are incorrect")
 
@@ -65,6 +259,7 @@ class TechnicalVisionSystem:
         """Add detection or segmentation methods to system (method_name)"""
         if methods is not None:
             self._detection_methods.extend(methods)
+            self._plan = None
         else:
             raise ValueError("Detection or segmentation methods are incerrect")
 
@@ -80,59 +275,567 @@ class TechnicalVisionSystem:
         if preprocessing_function is not None:
             self._preprocessing_function = preprocessing_function
 
+    def set_worker_pool(self, worker_pool):
+        """Processes images on warm workers of the pool (executor and workers count are taken from it)"""
+        self._worker_pool = worker_pool
+        if worker_pool is not None:
+            self._executor = worker_pool.executor
+            self._workers_count = worker_pool.workers_count
+
+    def add_joint_system(self, technical_vision_system):
+        """Add system which processes the same images (shared prefix of filters chains is applied once)"""
+        if technical_vision_system is None or technical_vision_system is self:
+            raise ValueError("Joint vision system is incorrect")
+        self._joint_systems.append(technical_vision_system)
+        self._plan = None
+
+    def compile(self):
+        """Compiles settings to execution plan (raises ValueError on invalid settings)"""
+        self._plan = compile_plan(
+            self._filters,
+            self._detail_extraction_methods,
+            self._detection_methods,
+            is_optimized=not self._is_intermediate_results_saves)
+
+        # Filters which read unknown neighbourhood and intermediate results saving need the whole image
+        self._strips_executor = None
+        if self._tiling_settings is not None and not self._is_intermediate_results_saves:
+            self._filters_halo = filters_chain_halo(self._filters)
+            if self._filters_halo is not None:
+                self._strips_executor = StripsExecutor(*self._tiling_settings)
+
+        # Intermediate images are saved per frame, so batches are filtered frame by frame
+        self._batched_filters_count = 0
+        if self._batch_size is not None and not self._is_intermediate_results_saves:
+            self._batched_filters_count = pointwise_prefix_length(self._plan.filters)
+
+        self._filters_tree = None
+        if self._joint_systems:
+            systems = self._all_systems()
+            for joint_system in self._joint_systems:
+                joint_system.compile()
+            self._filters_tree = compile_filters_tree(
+                [system.filters for system in systems],
+                is_optimized=not any(system.is_intermediate_results_saves for system in systems))
+
     def start_processing(self):
-        """Calls when vision system object is ready for processing"""
-        image_source = ImageSource(self._sources)
+        """Calls when vision system object is ready for processing, returns summary of metrics if enabled"""
+        image_source = ImageSource(
+            self._sources,
+            self._resolve_decode_mode(),
+            self._prefetch_threads_count,
+            self._read_ahead_count,
+            metrics=self._metrics,
+            **self._sources_scanning_settings)
+
+        if self._plan is None:
+            self.compile()
+
+        if self._joint_systems and self._executor == PIPELINE_EXECUTOR:
+            raise ValueError("Joint vision systems are not supported by pipeline executor")
+        if self._joint_systems and self._result_cache_settings is not None:
+            raise ValueError("Joint vision systems are not supported with result cache")
+        if self._batch_size is not None and (
+                self._executor == PIPELINE_EXECUTOR
+                or self._joint_systems
+                or self._result_cache_settings is not None):
+            raise ValueError("Batch mode is not supported by pipeline executor, joint systems and result cache")
+
+        configure_result_writer(**self._result_writer_settings)
+        self._open_result_cache()
 
         if self._preprocessing_function is not None:
             self._preprocessing_function()
 
-        if self._is_parallel_processing:
-            cpu_count = multiprocessing.cpu_count()
-            with ThreadPool(cpu_count) as pool:
-                pool.map(self._process_raw_image, image_source.images())
+        # Profiler of every run has own id, so parts of dump written by its workers are not mixed with others
+        self._profiler = SamplingProfiler(*self._profiling_settings)\
+            if self._profiling_settings is not None else None
+
+        if self._metrics is not None:
+            is_pipeline = self._executor == PIPELINE_EXECUTOR
+            workers_count = 1 if self._executor == SERIAL_EXECUTOR else self.workers_count
+            self._metrics.start(workers_count, self.pipeline_stages_workers if is_pipeline else None)
+
+        if self._executor == PROCESS_EXECUTOR:
+            worker_settings = self.worker_settings()
+            if self._worker_pool is not None:
+                self._worker_pool.run_process_job(
+                    worker_settings, self._source_work_items(image_source), self.queue_depth,
+                    *self._scheduling_callbacks(image_source))
+            else:
+                run_on_process_pool(
+                    worker_settings, self.workers_count, self._source_work_items(image_source), self.queue_depth,
+                    *self._scheduling_callbacks(image_source))
+        elif self._executor == PIPELINE_EXECUTOR:
+            self._run_pipeline(image_source)
+        elif self._executor == THREAD_EXECUTOR and self._worker_pool is not None:
+            self._run_on_thread_pool(self._worker_pool.pool, image_source)
+        elif self._executor == THREAD_EXECUTOR:
+            with ThreadPool(self.workers_count) as pool:
+                self._run_on_thread_pool(pool, image_source)
+        elif self._batch_size is not None:
+            process_images_batch = self._profiled(self._process_decoded_images_batch)
+            complete_batch = self._done_callback(image_source)
+            for raw_images in split_to_batches(image_source.images(), self._batch_size):
+                self._record_batch_timings(process_images_batch(raw_images))
+                complete_batch(raw_images)
+        elif self._result_cache is not None:
+            process_source_image = self._profiled(self._process_source_image)
+            for source_item in image_source.items():
+                self._record_timings(process_source_image(source_item))
+                image_source.complete(source_item)
         else:
+            process_decoded_image = self._profiled(self._process_decoded_image)
             for raw_image in image_source.images():
-                self._process_raw_image(raw_image)
+                self._record_timings(process_decoded_image(raw_image))
+                image_source.complete(raw_image)
+
+        flush_results()
+        release_frame_stores()
+        # Cursor of failed run stays after the last processed path saved by the run
+        image_source.save_cursor()
+        if self._profiler is not None:
+            self._profiler.dump()
+        return self._metrics.finish() if self._metrics is not None else None
+
+    def processing_settings(self):
+        """Settings of processing steps: filters, details extraction and detection methods, result processing"""
+        return (
+            self._filters,
+            self._detail_extraction_methods,
+            self._detection_methods,
+            self._result_processing_function,
+            self._is_intermediate_results_saves)
+
+    def worker_settings(self):
+        """Settings of worker processes as (system class, arguments of its from_worker_settings)"""
+        return type(self), (
+            [system.processing_settings() for system in self._all_systems()],
+            self._resolve_decode_mode(),
+            get_result_writer_settings(),
+            self._result_cache_settings,
+            self._tiling_settings,
+            self._is_timings_collected,
+            self._profiler.settings if self._profiler is not None else None,
+            (self._batch_size, self._max_batched_frame_pixels),
+            get_cascades_generation())
+
+    @classmethod
+    def from_worker_settings(
+            cls, systems_settings, decode_mode, result_writer_settings, result_cache_settings, tiling_settings,
+            is_timings_collected, profiling_settings, batching_settings, cascades_generation):
+        """Creates compiled system in worker process (result writer and cascades of the process are configured)"""
+        # Cascades evicted by the main process are loaded again by workers of shared pool
+        sync_cascades_generation(cascades_generation)
+        configure_result_writer(**result_writer_settings)
+        systems = [cls._from_processing_settings(*system_settings) for system_settings in systems_settings]
+        system = systems[0]
+        system.decode_mode = decode_mode
+        for joint_system in systems[1:]:
+            system.add_joint_system(joint_system)
+        if result_cache_settings is not None:
+            system.set_result_cache(*result_cache_settings)
+        if tiling_settings is not None:
+            system.set_tiling(*tiling_settings)
+        # Timings are returned to the main process which collects metrics
+        system._is_timings_collected = is_timings_collected
+        # Samples are written to parts of dump which are merged by the main process
+        system._profiler = SamplingProfiler(*profiling_settings) if profiling_settings is not None else None
+        system.set_batching(*batching_settings)
+        system.compile()
+        system._open_result_cache()
+        return system
+
+    @classmethod
+    def _from_processing_settings(
+            cls, filters, detail_extraction_methods, detection_methods,
+            result_processing_function, is_intermediate_results_saves):
+        system = cls()
+        system.add_filters(filters)
+        system.add_details_extraction_methods(detail_extraction_methods)
+        system.add_detection_methods(detection_methods)
+        system.add_result_processing_function(result_processing_function)
+        system.is_intermediate_results_saves = is_intermediate_results_saves
+        return system
+
+    def process_work_item(self, work_item):
+        """Processes source item read by worker (list of source items in batch mode), returns timings"""
+        if self._batch_size is not None:
+            return self._profiled(self._process_source_items_batch)(work_item)
+        return self._profiled(self._process_source_image)(work_item)
+
+    def dump_profile_part(self):
+        """Writes samples of profiler of worker process to own part of dump"""
+        if self._profiler is not None:
+            self._profiler.dump_part()
+
+    def _profiled(self, function):
+        # Sampled calls of function are profiled if profiling is enabled
+        return functools.partial(self._profiler.call, function) if self._profiler is not None else function
+
+    def _scheduling_callbacks(self, image_source):
+        # Result, queue depth and done callbacks of bounded scheduling (results of batch mode are timings lists)
+        done_callback = self._done_callback(image_source)
+        if self._metrics is None:
+            return None, None, done_callback
+        result_callback = self._record_batch_timings if self._batch_size is not None else self._record_timings
+        queue_depth_callback = lambda depth: self._metrics.record_queue_depth("in_flight", depth)
+        return result_callback, queue_depth_callback, done_callback
+
+    def _done_callback(self, image_source):
+        # Processed items advance cursor of the source, work items of batch mode are lists of items
+        def _complete_batch(items):
+            for item in items:
+                image_source.complete(item)
 
-    def _process_raw_image(self, raw_image):
-        processed_image = self._apply_all_filters(raw_image)
-        processed_image, image_details = self._extract_all_details(processed_image)
+        return _complete_batch if self._batch_size is not None else image_source.complete
+
+    def _record_timings(self, timings, is_image_finished=True):
+        if timings is not None:
+            self._metrics.record_timings(timings, is_image_finished)
+
+    def _record_batch_timings(self, timings_list):
+        for timings in timings_list:
+            self._record_timings(timings)
+
+    def _source_work_items(self, image_source):
+        # Work item of process worker is a source item or a list of them in batch mode
+        if self._batch_size is not None:
+            return split_to_batches(image_source.items(), self._batch_size)
+        return image_source.items()
+
+    def _run_on_thread_pool(self, pool, image_source):
+        if self._batch_size is not None:
+            run_bounded(
+                pool, self._profiled(self._process_decoded_images_batch),
+                split_to_batches(image_source.images(), self._batch_size), self.queue_depth,
+                *self._scheduling_callbacks(image_source))
+        elif self._result_cache is not None:
+            run_bounded(
+                pool, self._profiled(self._process_source_image), image_source.items(), self.queue_depth,
+                *self._scheduling_callbacks(image_source))
+        else:
+            run_bounded(
+                pool, self._profiled(self._process_decoded_image), image_source.images(), self.queue_depth,
+                *self._scheduling_callbacks(image_source))
+
+    def _resolve_decode_mode(self):
+        if self._decode_mode != AUTO_DECODE_MODE:
+            return self._decode_mode
+        # Image is decoded once for all joint systems, so all chains should start with gray filter
+        is_gray_chains = all(
+            len(system.filters) > 0 and system.filters[0]["filter_name"] == "cv2_gray_filter"
+            for system in self._all_systems())
+        return GRAYSCALE_DECODE_MODE if is_gray_chains else COLOR_DECODE_MODE
+
+    def _all_systems(self):
+        return [self] + self._joint_systems
+
+    def _open_result_cache(self):
+        # Results of stateful detection methods depend on previous frames, so they are never cached
+        if self._result_cache_settings is None or is_stateful_plan(self._plan):
+            self._result_cache = None
+            return
+        self._result_cache = ResultCache(*self._result_cache_settings)
+        self._settings_fingerprint = settings_fingerprint(
+            self._filters,
+            self._detail_extraction_methods,
+            self._detection_methods,
+            self._resolve_decode_mode())
+
+    def _read_source_image(self, source_item, timings=None):
+        # Returns (raw image, result cache key, cached results), frames of videos and stores are not cached
+        if isinstance(source_item, FrameReference):
+            started_time = time.perf_counter()
+            raw_image = ImageSource.read_frame(source_item, self._resolve_decode_mode())
+            _add_timing(timings, DECODE_METRIC, started_time)
+            return raw_image, None, None
+        if not isinstance(source_item, str):
+            return source_item, None, None
+
+        image_path = source_item
+        started_time = time.perf_counter()
+        if self._result_cache is None:
+            raw_image = ImageSource.read_image(image_path, self._resolve_decode_mode())
+            _add_timing(timings, DECODE_METRIC, started_time)
+            return raw_image, None, None
+
+        with open(image_path, "rb") as image_file:
+            image_bytes = image_file.read()
+        cache_key = self._result_cache.key(image_bytes, self._settings_fingerprint)
+        raw_image = ImageSource.decode_image(image_bytes, self._resolve_decode_mode())
+        _add_timing(timings, DECODE_METRIC, started_time)
+        cached_results = self._result_cache.get(cache_key) if raw_image is not None else None
+        return raw_image, cache_key, cached_results
+
+    def _process_source_image(self, source_item):
+        # Returns timings of image processing steps if they are collected
+        timings = {} if self._is_timings_collected else None
+        started_time = time.perf_counter()
+        raw_image, cache_key, cached_results = self._read_source_image(source_item, timings)
+        if raw_image is None:
+            return None
+
+        if cached_results is not None:
+            self._process_cached_results(raw_image, cached_results, timings)
+        else:
+            self._process_raw_image(raw_image, cache_key, timings)
+        _add_timing(timings, IMAGE_METRIC, started_time)
+        return timings
+
+    def _process_decoded_image(self, raw_image):
+        timings = {} if self._is_timings_collected else None
+        started_time = time.perf_counter()
+        self._process_raw_image(raw_image, None, timings)
+        _add_timing(timings, IMAGE_METRIC, started_time)
+        return timings
+
+    def _process_source_items_batch(self, source_items):
+        # Decoding of every image is included to its image time
+        raw_images, timings_list = [], []
+        for source_item in source_items:
+            timings = {} if self._is_timings_collected else None
+            started_time = time.perf_counter()
+            raw_image, _, _ = self._read_source_image(source_item, timings)
+            _add_timing(timings, IMAGE_METRIC, started_time)
+            if raw_image is not None:
+                raw_images.append(raw_image)
+                timings_list.append(timings)
+        return self._process_decoded_images_batch(raw_images, timings_list)
+
+    def _process_decoded_images_batch(self, raw_images, timings_list=None):
+        # Returns timings of every image (None items if timings are not collected)
+        if timings_list is None:
+            timings_list = [{} if self._is_timings_collected else None for _ in raw_images]
+
+        for frames_indices in group_by_format(raw_images, self._max_batched_frame_pixels):
+            frames = [raw_images[frame_index] for frame_index in frames_indices]
+            frames_timings = [timings_list[frame_index] for frame_index in frames_indices]
+            if len(frames) == 1 or self._batched_filters_count == 0 or (
+                    self._strips_executor is not None and self._strips_executor.is_applicable(frames[0])):
+                for raw_image, timings in zip(frames, frames_timings):
+                    started_time = time.perf_counter()
+                    self._process_raw_image(raw_image, None, timings)
+                    _add_timing(timings, IMAGE_METRIC, started_time)
+                continue
+
+            started_time = time.perf_counter()
+            filtered_frames = self._apply_batched_filters(frames, frames_timings)
+            _add_shared_timing(frames_timings, IMAGE_METRIC, started_time)
+
+            # Frames are views of the batch buffer of worker, other filters are applied frame by frame
+            for raw_image, filtered_frame, timings in zip(frames, filtered_frames, frames_timings):
+                started_time = time.perf_counter()
+                processed_image = self._apply_all_filters(filtered_frame, timings, self._batched_filters_count)
+                self._process_filtered_image(raw_image, processed_image, None, timings)
+                _add_timing(timings, IMAGE_METRIC, started_time)
+        return timings_list
+
+    def _apply_batched_filters(self, frames, frames_timings):
+        started_time = time.perf_counter()
+        batch_image = stack_frames(frames)
+        buffers = get_worker_buffers()
+        for filter_name, filter_function in self._plan.filters[:self._batched_filters_count]:
+            filter_started_time = time.perf_counter()
+            batch_image = filter_function(batch_image, buffers)
+            _add_shared_timing(frames_timings, FILTER_METRIC_PREFIX + filter_name, filter_started_time)
+        _add_shared_timing(frames_timings, FILTERS_METRIC, started_time)
+        return unstack_frames(batch_image, len(frames))
+
+    def _process_cached_results(self, raw_image, cached_results, timings=None):
+        # Raw image is still decoded because high-level processing draws results on it
+        image_details, detected_elements_descriptions = cached_results
+        started_time = time.perf_counter()
+        self._result_processing_function(
+            _drawable(raw_image), None, image_details, detected_elements_descriptions)
+        _add_timing(timings, HIGH_LEVEL_PROCESSING_METRIC, started_time)
+
+    def _run_pipeline(self, image_source):
+        stages_workers = self.pipeline_stages_workers
+        # Calls of all stages are sampled for profiling together
+        StagedPipeline(self.queue_depth, self._metrics)\
+            .add_stage(
+                ACQUISITION_STAGE,
+                self._profiled(self._acquisition_stage),
+                stages_workers[ACQUISITION_STAGE])\
+            .add_stage(FILTERS_STAGE, self._profiled(self._filters_stage), stages_workers[FILTERS_STAGE])\
+            .add_stage(
+                DETAILS_EXTRACTION_STAGE,
+                self._profiled(self._details_extraction_stage),
+                stages_workers[DETAILS_EXTRACTION_STAGE])\
+            .add_stage(DETECTION_STAGE, self._profiled(self._detection_stage), stages_workers[DETECTION_STAGE])\
+            .add_stage(
+                HIGH_LEVEL_PROCESSING_STAGE,
+                self._profiled(self._high_level_processing_stage),
+                stages_workers[HIGH_LEVEL_PROCESSING_STAGE])\
+            .run(image_source.items(), image_source.complete)
+
+    # Timings of pipeline stages are recorded by the pipeline, stages record timings of their steps
+
+    def _acquisition_stage(self, source_item):
+        timings = {} if self._is_timings_collected else None
+        raw_image, cache_key, cached_results = self._read_source_image(source_item, timings)
+        if raw_image is None:
+            return None
+
+        if cached_results is not None:
+            self._process_cached_results(raw_image, cached_results, timings)
+            self._record_timings(timings)
+            return None
+        self._record_timings(timings, is_image_finished=False)
+        return raw_image, cache_key
+
+    def _filters_stage(self, stage_data):
+        raw_image, cache_key = stage_data
+        timings = {} if self._is_timings_collected else None
+        # Buffers of the filters stage worker are reused by its next frame, so result is detached from them
+        processed_image = self._apply_all_filters(raw_image, timings).copy()
+        self._record_timings(timings, is_image_finished=False)
+        return raw_image, cache_key, processed_image
+
+    def _details_extraction_stage(self, stage_data):
+        raw_image, cache_key, processed_image = stage_data
+        timings = {} if self._is_timings_collected else None
+        processed_image, image_details = self._extract_all_details(processed_image, timings)
+        self._record_timings(timings, is_image_finished=False)
+        return raw_image, cache_key, processed_image, image_details
+
+    def _detection_stage(self, stage_data):
+        raw_image, cache_key, processed_image, image_details = stage_data
+        timings = {} if self._is_timings_collected else None
         processed_image, detected_elements_descriptions =\
-            self._apply_all_detection_methods(processed_image, image_details)
+            self._apply_all_detection_methods(processed_image, image_details, timings)
+        self._cache_results(cache_key, image_details, detected_elements_descriptions)
+        self._record_timings(timings, is_image_finished=False)
+        return raw_image, processed_image, image_details, detected_elements_descriptions
+
+    def _high_level_processing_stage(self, stage_data):
+        raw_image, processed_image, image_details, detected_elements_descriptions = stage_data
+        timings = {} if self._is_timings_collected else None
+        started_time = time.perf_counter()
         self._result_processing_function(
-            raw_image, processed_image, image_details, detected_elements_descriptions)
+            _drawable(raw_image), processed_image, image_details, detected_elements_descriptions)
+        _add_timing(timings, HIGH_LEVEL_PROCESSING_METRIC, started_time)
+        self._record_timings(timings)
 
-    def _apply_all_filters(self, image):
-        filtered_image = image.copy()
-        unique_directory_name = str(uuid.uuid4())
+    def _cache_results(self, cache_key, image_details, detected_elements_descriptions):
+        if cache_key is not None:
+            self._result_cache.put(cache_key, image_details, detected_elements_descriptions)
 
-        for filter_object in self._filters:
-            filter_name = filter_object["filter_name"]
-            filter_function = FILTER_MAPPING[filter_name]
-            filtered_image = filter_function(filtered_image, filter_object["filter_parameters"])
+    def _process_raw_image(self, raw_image, cache_key=None, timings=None):
+        if self._filters_tree is not None:
+            self._process_joint_systems(raw_image, timings)
+        else:
+            processed_image = self._apply_all_filters(raw_image, timings)
+            self._process_filtered_image(raw_image, processed_image, cache_key, timings)
+
+    def _process_filtered_image(self, raw_image, processed_image, cache_key=None, timings=None):
+        processed_image, image_details = self._extract_all_details(processed_image, timings)
+        processed_image, detected_elements_descriptions =\
+            self._apply_all_detection_methods(processed_image, image_details, timings)
+        self._cache_results(cache_key, image_details, detected_elements_descriptions)
+        started_time = time.perf_counter()
+        self._result_processing_function(
+            _drawable(raw_image), processed_image, image_details, detected_elements_descriptions)
+        _add_timing(timings, HIGH_LEVEL_PROCESSING_METRIC, started_time)
+
+    def _apply_all_filters(self, image, timings=None, first_filter_index=0):
+        # Filters before the first filter index are already applied to the batch of image
+        started_time = time.perf_counter()
+        if first_filter_index == 0 and self._strips_executor is not None\
+                and self._strips_executor.is_applicable(image):
+            filtered_image = self._strips_executor.apply(self._plan.filters, self._filters_halo, image)
+            _add_timing(timings, FILTERS_METRIC, started_time)
+            return filtered_image
+
+        filtered_image = image
+        buffers = get_worker_buffers()
+        unique_directory_name = str(uuid.uuid4()) if self._is_intermediate_results_saves else None
+
+        for filter_name, filter_function in self._plan.filters[first_filter_index:]:
+            filter_started_time = time.perf_counter()
+            filtered_image = filter_function(filtered_image, buffers)
+            _add_timing(timings, FILTER_METRIC_PREFIX + filter_name, filter_started_time)
 
             if self._is_intermediate_results_saves:
                 save_filtered_image(filtered_image, unique_directory_name, filter_name)
 
-        return filtered_image
+        _add_timing(timings, FILTERS_METRIC, started_time)
+        # Filtered image is a worker buffer (valid until the next frame of the worker) or a new image,
+        # frame of filtered batch is a worker buffer too
+        return filtered_image if filtered_image is not image or first_filter_index > 0 else image.copy()
+
+    def _process_joint_systems(self, raw_image, timings=None):
+        systems = self._all_systems()
+        is_intermediate_results_saves = any(system.is_intermediate_results_saves for system in systems)
+        unique_directory_name = str(uuid.uuid4()) if is_intermediate_results_saves else None
+        self._apply_filters_tree(
+            self._filters_tree, systems, raw_image, raw_image, get_worker_buffers(), unique_directory_name,
+            timings)
 
-    def _extract_all_details(self, image):
+    def _apply_filters_tree(
+            self, node, systems, raw_image, image, buffers, unique_directory_name, timings=None):
+        consumers_count = len(node.children) + len(node.chains_indices)
+        if consumers_count > 1 and image is not raw_image:
+            # Branches write to the same worker buffers, so shared result is detached from them
+            image = image.copy()
+
+        for child_node in node.children.values():
+            started_time = time.perf_counter()
+            filtered_image = child_node.filter_function(image, buffers)
+            _add_timing(timings, FILTER_METRIC_PREFIX + child_node.filter_name, started_time)
+            if unique_directory_name is not None:
+                save_filtered_image(filtered_image, unique_directory_name, child_node.filter_name)
+            self._apply_filters_tree(
+                child_node, systems, raw_image, filtered_image, buffers, unique_directory_name, timings)
+
+        # High-level processing of every system draws on its own copy of raw image
+        last_chain_index = node.chains_indices[-1] if node.chains_indices else None
+        for chain_index in node.chains_indices:
+            is_last_consumer = chain_index == last_chain_index and image is not raw_image
+            systems[chain_index]._process_filtered_image(
+                raw_image.copy(),
+                image if is_last_consumer else image.copy(),
+                timings=timings)
+
+    def _extract_all_details(self, image, timings=None):
+        started_time = time.perf_counter()
         details_container = []
-        for details_extraction_method in self._detail_extraction_methods:
-            de_method_name = details_extraction_method["name"]
-            de_method_parameters = details_extraction_method["parameters"]
-            de_method = DETAILS_EXTRACTION_METHODS[de_method_name]
-            details = de_method(image, de_method_parameters)
+        for de_method_name, de_method in self._plan.details_extraction_methods:
+            details = de_method(image)
             details_container.append((de_method_name, details))
+        _add_timing(timings, DETAILS_EXTRACTION_METRIC, started_time)
         return image, details_container
 
-    def _apply_all_detection_methods(self, image, image_details):
+    def _apply_all_detection_methods(self, image, image_details, timings=None):
+        started_time = time.perf_counter()
         detected_elements_descriptions = []
-        for detection_method_description in self._detection_methods:
-            dos_method_name = detection_method_description["name"]
-            dos_method_parameters = detection_method_description["parameters"]
-            dos_method = DETECTION_METHODS[dos_method_name]
-            image, description = dos_method(image, image_details, dos_method_parameters)
+        for dos_method_name, dos_method in self._plan.detection_methods:
+            image, description = dos_method(image, image_details)
             detected_elements_descriptions.append((dos_method_name, description))
+        _add_timing(timings, DETECTION_METRIC, started_time)
         return image, detected_elements_descriptions
+
+
+def _drawable(raw_image):
+    # Frames of stores are read-only views of memory map, high-level processing draws on their copies
+    return raw_image if raw_image.flags.writeable else raw_image.copy()
+
+
+def _add_timing(timings, name, started_time):
+    # Timings of joint systems and repeated steps are summed
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started_time
+
+
+def _add_shared_timing(timings_list, name, started_time):
+    # Time of a step applied to the whole batch is shared equally by its images
+    if timings_list and timings_list[0] is not None:
+        duration = (time.perf_counter() - started_time) / len(timings_list)
+        for timings in timings_list:
+            timings[name] = timings.get(name, 0.0) + duration
+
+
+def _skip_result_processing(raw_image, processed_image, image_details, detected_elements_descriptions):
+    pass
+
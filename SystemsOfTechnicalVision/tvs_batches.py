@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Batches of equal-sized frames which are filtered by point-wise filters as one image"""
+import numpy as np
+
+
+# Filters which compute every result pixel from the same source pixel only
+POINTWISE_FILTERS = frozenset((
+    "cv2_gray_filter",
+    "cv2_hsv_filter",
+    "cv2_hsv_color_range_filter",
+    "cv2_binarization_filter"))
+
+# Stacking copy of larger frames costs more than calls of filters it saves
+DEFAULT_MAX_BATCHED_FRAME_PIXELS = 128 * 128
+
+
+def pointwise_prefix_length(filters):
+    """Returns count of compiled filters (name, function) at the start of chain which are point-wise"""
+    length = 0
+    for filter_name, _ in filters:
+        if filter_name not in POINTWISE_FILTERS:
+            break
+        length += 1
+    return length
+
+
+def split_to_batches(items, batch_size):
+    """Yields lists of up to batch_size consecutive items"""
+    if batch_size <= 0:
+        raise ValueError("Batch size should be positive")
+
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def group_by_format(frames, max_frame_pixels=DEFAULT_MAX_BATCHED_FRAME_PIXELS):
+    """Returns lists of indices of frames with equal shape and type (in order of the first frame of group)
+
+    Frames with more than max_frame_pixels pixels are not grouped.
+    """
+    groups = {}
+    single_frames_indices = []
+    for frame_index, frame in enumerate(frames):
+        if frame.shape[0] * frame.shape[1] > max_frame_pixels:
+            single_frames_indices.append([frame_index])
+        else:
+            groups.setdefault((frame.shape, frame.dtype), []).append(frame_index)
+    return list(groups.values()) + single_frames_indices
+
+
+def stack_frames(frames):
+    """Returns frames stacked to one contiguous image of N * height rows
+
+    Point-wise filters give the same pixels for the stacked image and for separate frames,
+    so every filter is called once per batch instead of once per frame.
+    """
+    return np.concatenate(frames, axis=0)
+
+
+def unstack_frames(batch_image, frames_count):
+    """Returns views of frames of filtered stacked image"""
+    return list(batch_image.reshape((frames_count, -1) + batch_image.shape[1:]))
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""Preallocated frame buffers of TVS workers reused by filters from frame to frame"""
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+# Buffers of frames with other shapes are released when sources contain images of many sizes
+MAX_FRAME_FORMATS_COUNT = 4
+
+_thread_local_storage = threading.local()
+
+
+class FrameBuffers:
+    """Ping-pong buffers for every frame shape and type, filters write results to them"""
+    def __init__(self, max_frame_formats_count=MAX_FRAME_FORMATS_COUNT):
+        self._max_frame_formats_count = max_frame_formats_count
+        self._buffers = OrderedDict()
+
+    def destination(self, shape, dtype, source, is_in_place):
+        """Returns buffer for filter result, source buffer is returned only for in-place filters"""
+        frame_format = (shape, dtype)
+        buffers_pair = self._buffers.get(frame_format)
+
+        if buffers_pair is None:
+            buffers_pair = (np.empty(shape, dtype), np.empty(shape, dtype))
+            self._buffers[frame_format] = buffers_pair
+            if len(self._buffers) > self._max_frame_formats_count:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(frame_format)
+
+        first_buffer, second_buffer = buffers_pair
+        if source is first_buffer:
+            return first_buffer if is_in_place else second_buffer
+        if source is second_buffer:
+            return second_buffer if is_in_place else first_buffer
+        return first_buffer
+
+
+def get_worker_buffers():
+    """Returns frame buffers of current worker thread"""
+    buffers = getattr(_thread_local_storage, "buffers", None)
+    if buffers is None:
+        buffers = FrameBuffers()
+        _thread_local_storage.buffers = buffers
+    return buffers
@@ -1,6 +1,9 @@
 #!/usr/bin/python3
 """System of technical vision builder"""
-from tvs import TechnicalVisionSystem
+from tvs import TechnicalVisionSystem, PIPELINE_EXECUTOR
+from tvs_tiles import DEFAULT_STRIP_HEIGHT, DEFAULT_MIN_IMAGE_PIXELS
+from tvs_profiling import DEFAULT_SAMPLE_INTERVAL
+from tvs_batches import DEFAULT_MAX_BATCHED_FRAME_PIXELS
 
 
 class TechnicalVisionSystemBuilder:
@@ -13,9 +16,76 @@ class TechnicalVisionSystemBuilder:
         self._technical_vision_system.is_parrallel_processing = True
         return self
 
+    def with_executor(self, executor):
+        """Determines executor of target vision system (serial, thread, process or pipeline)"""
+        self._technical_vision_system.executor = executor
+        return self
+
+    def with_workers_count(self, workers_count):
+        """Determines count of parallel workers of target vision system"""
+        self._technical_vision_system.workers_count = workers_count
+        return self
+
+    def with_queue_depth(self, queue_depth):
+        """Determines max count of images in flight for parallel processing"""
+        self._technical_vision_system.queue_depth = queue_depth
+        return self
+
+    def in_pipeline(self):
+        """Enables staged pipeline processing (acquisition, filters, details, detection, high-level)"""
+        self._technical_vision_system.executor = PIPELINE_EXECUTOR
+        return self
+
+    def with_pipeline_stages_workers(self, stages_workers):
+        """Determines workers count for stages of pipeline processing"""
+        self._technical_vision_system.pipeline_stages_workers = stages_workers
+        return self
+
+    def with_result_writer(self, settings):
+        """Determines writer threads count, queue depth, image format and encoding quality of results"""
+        self._technical_vision_system.set_result_writer_settings(settings)
+        return self
+
+    def with_result_cache(self, directory_path, max_size_mb=1024):
+        """Caches details and detection results, unchanged images skip processing on the next runs"""
+        self._technical_vision_system.set_result_cache(directory_path, max_size_mb * 1024 * 1024)
+        return self
+
+    def on_worker_pool(self, worker_pool):
+        """Processes images on warm workers of pool shared with other vision systems"""
+        self._technical_vision_system.set_worker_pool(worker_pool)
+        return self
+
+    def with_tiling(
+            self, strip_height=DEFAULT_STRIP_HEIGHT, threads_count=None, min_image_pixels=DEFAULT_MIN_IMAGE_PIXELS):
+        """Filters overlapping strips of large images in parallel threads (result is equal to whole image one)"""
+        self._technical_vision_system.set_tiling(strip_height, threads_count, min_image_pixels)
+        return self
+
+    def with_metrics(self, stream_path=None):
+        """Collects timings of processing steps and throughput, start_processing returns their summary"""
+        self._technical_vision_system.set_metrics(True, stream_path)
+        return self
+
+    def with_profiling(self, dump_path, sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        """Profiles every sample_interval-th image by cProfile, dump of all workers is written at the end"""
+        self._technical_vision_system.set_profiling(dump_path, sample_interval)
+        return self
+
+    def with_batching(self, batch_size, max_frame_pixels=DEFAULT_MAX_BATCHED_FRAME_PIXELS):
+        """Processes images by batches, point-wise filters are applied once to small equal-sized images"""
+        self._technical_vision_system.set_batching(batch_size, max_frame_pixels)
+        return self
+
+    def with_joint_system(self, technical_vision_system):
+        """Processes the same images by other vision system, equal filters are applied once for both"""
+        self._technical_vision_system.add_joint_system(technical_vision_system)
+        return self
+
     def save_intermediate_results(self):
         """Save image after all steps of processing"""
         self._technical_vision_system.is_intermediate_results_saves = True
+        return self
 
     def from_source(self, source):
         """Applies single source to target vision system"""
@@ -27,6 +97,33 @@ class TechnicalVisionSystemBuilder:
         self._technical_vision_system.add_sources(sources)
         return self
 
+    def with_sources_scanning(self, is_recursive=False, extensions=None, patterns=None, min_file_size=0):
+        """Determines recursion, allowed extensions, file name patterns and min size of source files"""
+        self._technical_vision_system.set_sources_scanning(is_recursive, extensions, patterns, min_file_size)
+        return self
+
+    def resuming_from_cursor(self, cursor_path):
+        """Continues sources listing after the last path listed by previous run"""
+        self._technical_vision_system.set_sources_cursor(cursor_path)
+        return self
+
+    def with_video_frames_reading(
+            self, frame_stride=1, frames_buffer_size=None, is_dropping_oldest_frames=False):
+        """Processes every frame_stride-th frame of videos, oldest buffered frames are dropped if enabled"""
+        self._technical_vision_system.set_video_frames_reading(
+            frame_stride, frames_buffer_size, is_dropping_oldest_frames)
+        return self
+
+    def with_decode_mode(self, decode_mode):
+        """Determines decode mode of source images (color, grayscale, reduced_* or auto)"""
+        self._technical_vision_system.decode_mode = decode_mode
+        return self
+
+    def with_prefetching(self, threads_count, read_ahead_count=None):
+        """Enables decoding of source images in background threads ahead of processing"""
+        self._technical_vision_system.set_prefetching(threads_count, read_ahead_count)
+        return self
+
     def with_filter(self, filter_name):
         """Determines single filter for target vision system"""
         self._technical_vision_system.add_filters([filter_name])
@@ -68,5 +165,6 @@ class TechnicalVisionSystemBuilder:
         return self
 
     def build(self):
-        """Returns ready-for-start technical vision system object"""
+        """Returns ready-for-start technical vision system object with compiled execution plan"""
+        self._technical_vision_system.compile()
         return self._technical_vision_system
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""On-disk cache of details extraction and detection results of source images"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+
+# Changing of results format or methods implementation should increase version to drop old results
+CACHE_FORMAT_VERSION = 1
+
+# Eviction removes least recently used results until cache size is below this part of max size
+EVICTION_TARGET_RATIO = 0.9
+
+_RESULT_FILE_EXTENSION = ".pickle"
+
+
+class ResultCache:
+    """Results keyed by image content hash and processing settings fingerprint, evicted in LRU order"""
+    def __init__(self, directory_path, max_size_bytes):
+        if max_size_bytes <= 0:
+            raise ValueError("Max size of result cache should be positive")
+        os.makedirs(directory_path, exist_ok=True)
+        self._directory_path = directory_path
+        self._max_size_bytes = max_size_bytes
+        self._size_bytes = sum(size for _, _, size in self._result_files())
+        self._lock = threading.Lock()
+
+    def key(self, image_bytes, settings_fingerprint):
+        """Returns cache key of source image file content processed with settings"""
+        return hashlib.sha256(settings_fingerprint.encode() + hashlib.sha256(image_bytes).digest()).hexdigest()
+
+    def get(self, key):
+        """Returns (image details, detected elements descriptions) or None if image was not processed"""
+        result_path = self._result_path(key)
+        try:
+            with open(result_path, "rb") as result_file:
+                result = pickle.load(result_file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        # Modification time is a recency mark of the result for LRU eviction
+        try:
+            os.utime(result_path)
+        except FileNotFoundError:
+            pass
+        return result
+
+    def put(self, key, image_details, detected_elements_descriptions):
+        """Saves results of image processing, evicts old results if cache is full"""
+        result_path = self._result_path(key)
+        temporary_result_path = f"{result_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_result_path, "wb") as result_file:
+            pickle.dump((image_details, detected_elements_descriptions), result_file)
+        result_size = os.path.getsize(temporary_result_path)
+        os.replace(temporary_result_path, result_path)
+
+        with self._lock:
+            self._size_bytes += result_size
+            if self._size_bytes > self._max_size_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Other workers write to the same directory, so size is recalculated from files
+        result_files = sorted(self._result_files())
+        self._size_bytes = sum(size for _, _, size in result_files)
+        target_size_bytes = self._max_size_bytes * EVICTION_TARGET_RATIO
+
+        for _, result_path, size in result_files:
+            if self._size_bytes <= target_size_bytes:
+                break
+            try:
+                os.remove(result_path)
+            except FileNotFoundError:
+                pass
+            self._size_bytes -= size
+
+    def _result_files(self):
+        result_files = []
+        with os.scandir(self._directory_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(_RESULT_FILE_EXTENSION):
+                    try:
+                        entry_stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    result_files.append((entry_stat.st_mtime, entry.path, entry_stat.st_size))
+        return result_files
+
+    def _result_path(self, key):
+        return os.path.join(self._directory_path, key + _RESULT_FILE_EXTENSION)
+
+
+def settings_fingerprint(filters, details_extraction_methods, detection_methods, decode_mode):
+    """Returns fingerprint of settings which determine details extraction and detection results
+
+    Contents of files referenced by "*_path" parameters (cascades) are part of the fingerprint,
+    so results are not reused after a file is replaced at the same path.
+    """
+    settings = {
+        "version": CACHE_FORMAT_VERSION,
+        "decode_mode": decode_mode,
+        "filters": filters,
+        "details_extraction_methods": details_extraction_methods,
+        "detection_methods": detection_methods
+    }
+    settings["files"] = _referenced_files_hashes(settings, None, {})
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def _referenced_files_hashes(value, key, files_hashes):
+    # Returns {path: content hash} of existing files which are values of "*_path" keys
+    if isinstance(value, dict):
+        for item_key, item in value.items():
+            _referenced_files_hashes(item, item_key, files_hashes)
+    elif isinstance(value, list):
+        for item in value:
+            _referenced_files_hashes(item, key, files_hashes)
+    elif isinstance(value, str) and key is not None and key.endswith("_path") and os.path.isfile(value):
+        if value not in files_hashes:
+            with open(value, "rb") as referenced_file:
+                files_hashes[value] = hashlib.sha256(referenced_file.read()).hexdigest()
+    return files_hashes
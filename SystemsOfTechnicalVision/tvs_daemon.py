@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""TVS daemon which processes jobs of local clients one after another on warm workers"""
+import json
+import os
+import socket
+import socketserver
+import time
+
+
+JOB_FILE_EXTENSION = ".job"
+RUNNING_JOB_FILE_EXTENSION = ".running"
+RESULT_FILE_EXTENSION = ".result"
+SPOOL_POLL_INTERVAL = 0.5
+
+
+def run_job_safely(run_job, job):
+    """Runs job (dictionary with settings and optional sources), returns result of job for client"""
+    started_time = time.monotonic()
+    try:
+        if not isinstance(job, dict) or "settings" not in job or not job["settings"]:
+            raise ValueError("Job should contain list of settings files")
+        run_job(job)
+    except Exception as error:
+        return {"status": "failed", "error": str(error), "duration": time.monotonic() - started_time}
+    return {"status": "done", "duration": time.monotonic() - started_time}
+
+
+def serve_spool_directory(directory_path, run_job, poll_interval=SPOOL_POLL_INTERVAL):
+    """Processes '*.job' files of directory in order of names and writes '*.result' files next to them
+
+    Clients should write job file with other extension and rename it, so partially written jobs are not taken.
+    """
+    os.makedirs(directory_path, exist_ok=True)
+    while True:
+        job_names = sorted(
+            filename[:-len(JOB_FILE_EXTENSION)]
+            for filename in os.listdir(directory_path)
+            if filename.endswith(JOB_FILE_EXTENSION))
+        for job_name in job_names:
+            _process_spool_job(directory_path, job_name, run_job)
+        if not job_names:
+            time.sleep(poll_interval)
+
+
+def serve_unix_socket(socket_path, run_job):
+    """Processes JSON jobs received over UNIX socket (one per line), replies with JSON result line"""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    class _JobRequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    result = run_job_safely(run_job, json.loads(line))
+                except ValueError as error:
+                    result = {"status": "failed", "error": f"Incorrect job: {error}"}
+                self.wfile.write((json.dumps(result) + "\n").encode())
+                self.wfile.flush()
+
+    # Single threaded server processes connections one by one, waiting clients form a queue of jobs
+    with socketserver.UnixStreamServer(socket_path, _JobRequestHandler) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(socket_path)
+
+
+def submit_job(socket_path, job):
+    """Sends job to daemon listening on UNIX socket and waits for its result"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        client_socket.connect(socket_path)
+        with client_socket.makefile("rwb") as stream:
+            stream.write((json.dumps(job) + "\n").encode())
+            stream.flush()
+            client_socket.shutdown(socket.SHUT_WR)
+            return json.loads(stream.readline())
+
+
+def _process_spool_job(directory_path, job_name, run_job):
+    job_path = os.path.join(directory_path, job_name + JOB_FILE_EXTENSION)
+    running_job_path = os.path.join(directory_path, job_name + RUNNING_JOB_FILE_EXTENSION)
+    try:
+        # Rename is atomic, so a job is taken only once when several daemons share the directory
+        os.rename(job_path, running_job_path)
+    except FileNotFoundError:
+        return
+
+    try:
+        with open(running_job_path) as job_file:
+            job = json.load(job_file)
+    except ValueError as error:
+        result = {"status": "failed", "error": f"Incorrect job: {error}"}
+    else:
+        result = run_job_safely(run_job, job)
+
+    result_path = os.path.join(directory_path, job_name + RESULT_FILE_EXTENSION)
+    with open(result_path + ".tmp", "w") as result_file:
+        json.dump(result, result_file)
+    os.replace(result_path + ".tmp", result_path)
+    os.remove(running_job_path)
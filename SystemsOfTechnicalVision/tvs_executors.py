@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+"""Executors of vision systems: pools of warm workers and entry points of worker processes"""
+import functools
+import itertools
+import multiprocessing
+import multiprocessing.util
+import signal
+from multiprocessing.dummy import Pool as ThreadPool
+from high_level_processing.common import flush_results
+from sources.frame_store import release_frame_stores
+from tvs_scheduler import run_bounded
+
+
+SERIAL_EXECUTOR = "serial"
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+PIPELINE_EXECUTOR = "pipeline"
+EXECUTORS = (SERIAL_EXECUTOR, THREAD_EXECUTOR, PROCESS_EXECUTOR, PIPELINE_EXECUTOR)
+
+
+class WorkerPool:
+    """Pool of warm workers shared by vision systems which process their jobs one after another"""
+    def __init__(self, executor, workers_count=None):
+        self._executor = executor
+        self._workers_count = workers_count if workers_count is not None else multiprocessing.cpu_count()
+        self._jobs_counter = itertools.count()
+        if self._workers_count <= 0:
+            raise ValueError("Workers count should be positive")
+
+        if executor == PROCESS_EXECUTOR:
+            # Every worker takes exactly one flush task because it waits others on the barrier
+            self._flush_barrier = multiprocessing.Barrier(self._workers_count)
+            self._pool = multiprocessing.Pool(
+                self._workers_count,
+                initializer=_initialize_shared_process_worker,
+                initargs=(self._flush_barrier,))
+        elif executor == THREAD_EXECUTOR:
+            self._pool = ThreadPool(self._workers_count)
+        else:
+            raise ValueError(f"Unsupported executor of worker pool: {executor}")
+
+    @property
+    def executor(self):
+        """Executor of pool workers (thread or process)"""
+        return self._executor
+
+    @property
+    def workers_count(self):
+        """Count of pool workers"""
+        return self._workers_count
+
+    @property
+    def pool(self):
+        """Underlying pool of workers"""
+        return self._pool
+
+    def run_process_job(
+            self, worker_settings, work_items, queue_depth, result_callback=None, queue_depth_callback=None,
+            done_callback=None):
+        """Processes images of job on worker processes and waits until workers write its results"""
+        job_function = functools.partial(_process_job_work_item, next(self._jobs_counter), worker_settings)
+        try:
+            run_bounded(
+                self._pool, job_function, work_items, queue_depth, result_callback, queue_depth_callback,
+                done_callback)
+        finally:
+            self._pool.map(_flush_shared_worker_results, range(self._workers_count), chunksize=1)
+
+    def close(self):
+        """Waits until workers finish and stops them"""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self._pool.terminate()
+            self._pool.join()
+        else:
+            self.close()
+
+
+def run_on_process_pool(
+        worker_settings, workers_count, work_items, queue_depth, result_callback=None, queue_depth_callback=None,
+        done_callback=None):
+    """Processes work items on a new pool of worker processes which is stopped at end
+
+    worker_settings is (system class, settings of its from_worker_settings).
+    """
+    pool = multiprocessing.Pool(
+        workers_count,
+        initializer=_initialize_process_worker,
+        initargs=(worker_settings,))
+    try:
+        run_bounded(
+            pool, _process_work_item, work_items, queue_depth, result_callback, queue_depth_callback,
+            done_callback)
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        # Workers exit normally to write their pending results
+        pool.close()
+    finally:
+        pool.join()
+
+
+# Vision system of the current worker process, built once by the pool initializer
+# (or by the first image of every job for workers of shared pool)
+_worker_system = None
+_worker_job_number = None
+_worker_flush_barrier = None
+
+
+def _initialize_process_worker(worker_settings):
+    multiprocessing.util.Finalize(None, flush_results, exitpriority=10)
+    multiprocessing.util.Finalize(None, _dump_worker_profile, exitpriority=10)
+    _configure_worker_system(worker_settings)
+
+
+def _initialize_shared_process_worker(flush_barrier):
+    global _worker_flush_barrier
+    _worker_flush_barrier = flush_barrier
+    # Interruption of daemon is handled by the main process which stops workers of the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    multiprocessing.util.Finalize(None, flush_results, exitpriority=10)
+
+
+def _configure_worker_system(worker_settings):
+    global _worker_system
+    system_class, system_settings = worker_settings
+    _worker_system = system_class.from_worker_settings(*system_settings)
+
+
+def _process_work_item(work_item):
+    return _worker_system.process_work_item(work_item)
+
+
+def _process_job_work_item(job_number, worker_settings, work_item):
+    global _worker_job_number
+    if job_number != _worker_job_number:
+        _configure_worker_system(worker_settings)
+        _worker_job_number = job_number
+    return _process_work_item(work_item)
+
+
+def _flush_shared_worker_results(_):
+    try:
+        flush_results()
+        release_frame_stores()
+        _dump_worker_profile()
+    finally:
+        _worker_flush_barrier.wait()
+
+
+def _dump_worker_profile():
+    if _worker_system is not None:
+        _worker_system.dump_profile_part()
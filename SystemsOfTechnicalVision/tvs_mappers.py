@@ -1,22 +1,35 @@
 #!/usr/bin/python3
 """Describes mappings from filter or methods names to Python functions"""
 from filters.sample_filter import sample_filter
-from filters.cv2_gray_filter import cv2_gray_filter
-from filters.cv2_binarization_filter import cv2_binarization_filter
-from filters.cv2_sobel_filter import cv2_sobel_filter
-from filters.cv2_blur_filter import cv2_blur_filter
-from filters.cv2_morphology_close_filter import cv2_morphology_close_filter
-from filters.cv2_erode_filter import cv2_erode_filter
-from filters.cv2_dilate_filter import cv2_dilate_filter
-from filters.cv2_hsv_filter import cv2_hsv_filter
-from filters.cv2_hsv_color_range_filter import cv2_hsv_color_range_filter
+from filters.cv2_gray_filter import cv2_gray_filter, prepare_cv2_gray_filter
+from filters.cv2_binarization_filter import cv2_binarization_filter, prepare_cv2_binarization_filter
+from filters.cv2_sobel_filter import cv2_sobel_filter, prepare_cv2_sobel_filter
+from filters.cv2_blur_filter import cv2_blur_filter, prepare_cv2_blur_filter
+from filters.cv2_morphology_close_filter import cv2_morphology_close_filter,\
+    prepare_cv2_morphology_close_filter
+from filters.cv2_erode_filter import cv2_erode_filter, prepare_cv2_erode_filter
+from filters.cv2_dilate_filter import cv2_dilate_filter, prepare_cv2_dilate_filter
+from filters.cv2_hsv_filter import cv2_hsv_filter, prepare_cv2_hsv_filter
+from filters.cv2_hsv_color_range_filter import cv2_hsv_color_range_filter,\
+    prepare_cv2_hsv_color_range_filter
 from details_extraction.sample_details_extraction import sample_details_extraction
-from details_extraction.extract_largest_contour import extract_largest_contour
-from details_extraction.white_area_size import white_area_size
+from details_extraction.extract_largest_contour import extract_largest_contour,\
+    prepare_extract_largest_contour
+from details_extraction.white_area_size import white_area_size, prepare_white_area_size
 from detection.sample_detection_method import sample_detection_method
-from detection.face_detection_method import face_detection_method
-from detection.plate_number_detection_method import plate_number_detection_method
-from detection.smile_detection_method import smile_detection_method
+from detection.face_detection_method import face_detection_method, prepare_face_detection_method
+from detection.plate_number_detection_method import plate_number_detection_method,\
+    prepare_plate_number_detection_method
+from detection.smile_detection_method import smile_detection_method, prepare_smile_detection_method
+from detection.tracking_face_detection_method import tracking_face_detection_method,\
+    prepare_tracking_face_detection_method
+from high_level_processing.sample_hl_processing import sample_hl_processing
+from high_level_processing.barcodes_hl_processing import barcodes_hl_processing
+from high_level_processing.faces_hl_processing import faces_hl_processing
+from high_level_processing.lumbers_hl_processing import lumbers_hl_processing
+from high_level_processing.plates_hl_processing import plates_hl_processing
+from high_level_processing.smiles_hl_processing import smiles_hl_processing
+from high_level_processing.preprocessing import clean_output_directory
 
 
 FILTER_MAPPING = {
@@ -45,5 +58,55 @@ DETECTION_METHODS = {
     "detection_test_method": sample_detection_method,
     "face_detection_method": face_detection_method,
     "plate_number_detection_method": plate_number_detection_method,
-    "smile_detection_method": smile_detection_method
+    "smile_detection_method": smile_detection_method,
+    "tracking_face_detection_method": tracking_face_detection_method
+}
+
+
+# Detection methods which results depend on previous frames, not only on the image
+STATEFUL_DETECTION_METHODS = frozenset((
+    "tracking_face_detection_method",))
+
+
+HIGH_LEVEL_PROCESSING_FUNCTIONS = {
+    "sample_hl_processing": sample_hl_processing,
+    "barcodes_hl_processing": barcodes_hl_processing,
+    "faces_hl_processing": faces_hl_processing,
+    "lumbers_hl_processing": lumbers_hl_processing,
+    "plates_hl_processing": plates_hl_processing,
+    "smiles_hl_processing": smiles_hl_processing
+}
+
+
+PREPROCESSING_FUNCTIONS = {
+    "clean_output_directory": clean_output_directory
+}
+
+
+# Functions which validate parameters once and return callables bound to them,
+# methods without preparation function are called with raw parameters
+FILTER_PREPARATION_MAPPING = {
+    "cv2_gray_filter": prepare_cv2_gray_filter,
+    "cv2_binarization_filter": prepare_cv2_binarization_filter,
+    "cv2_sobel_filter": prepare_cv2_sobel_filter,
+    "cv2_blur_filter": prepare_cv2_blur_filter,
+    "cv2_morphology_close_filter": prepare_cv2_morphology_close_filter,
+    "cv2_erode_filter": prepare_cv2_erode_filter,
+    "cv2_dilate_filter": prepare_cv2_dilate_filter,
+    "cv2_hsv_filter": prepare_cv2_hsv_filter,
+    "cv2_hsv_color_range_filter": prepare_cv2_hsv_color_range_filter
+}
+
+
+DETAILS_EXTRACTION_PREPARATION_METHODS = {
+    "extract_largest_contour": prepare_extract_largest_contour,
+    "white_area_size": prepare_white_area_size
+}
+
+
+DETECTION_PREPARATION_METHODS = {
+    "face_detection_method": prepare_face_detection_method,
+    "plate_number_detection_method": prepare_plate_number_detection_method,
+    "smile_detection_method": prepare_smile_detection_method,
+    "tracking_face_detection_method": prepare_tracking_face_detection_method
 }
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+"""Timings, throughput and queue depths of TVS processing"""
+import json
+import math
+import threading
+import time
+
+
+DECODE_METRIC = "decode"
+FILTERS_METRIC = "filters"
+FILTER_METRIC_PREFIX = "filter:"
+DETAILS_EXTRACTION_METRIC = "details_extraction"
+DETECTION_METRIC = "detection"
+HIGH_LEVEL_PROCESSING_METRIC = "high_level_processing"
+IMAGE_METRIC = "image"
+STAGE_METRIC_PREFIX = "stage:"
+
+# Histogram buckets are powers of two of microseconds (1 us .. ~36 min)
+_BUCKETS_COUNT = 32
+
+
+class LatencyHistogram:
+    """Histogram of latencies with logarithmic buckets, percentiles are upper bounds of buckets"""
+    def __init__(self):
+        self._buckets = [0] * _BUCKETS_COUNT
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds):
+        """Adds latency to histogram"""
+        microseconds = seconds * 1e6
+        bucket_index = 0
+        if microseconds >= 1:
+            bucket_index = min(int(math.log2(microseconds)) + 1, _BUCKETS_COUNT - 1)
+        self._buckets[bucket_index] += 1
+        self._count += 1
+        self._total += seconds
+        self._max = max(self._max, seconds)
+
+    def summary(self):
+        """Returns count, total and mean time, percentiles and max latency in seconds"""
+        return {
+            "count": self._count,
+            "total": self._total,
+            "mean": self._total / self._count if self._count > 0 else 0.0,
+            "p50": self._percentile(0.5),
+            "p90": self._percentile(0.9),
+            "p99": self._percentile(0.99),
+            "max": self._max
+        }
+
+    def _percentile(self, fraction):
+        threshold = fraction * self._count
+        accumulated_count = 0
+        for bucket_index, bucket_count in enumerate(self._buckets):
+            accumulated_count += bucket_count
+            if bucket_count > 0 and accumulated_count >= threshold:
+                return min(2 ** bucket_index / 1e6, self._max)
+        return 0.0
+
+
+class Metrics:
+    """Collects timings of processing steps of all workers, optionally streams them as JSON lines"""
+    def __init__(self, stream_path=None):
+        self._stream_path = stream_path
+        self._stream = None
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._queue_depths = {}
+        self._images_count = 0
+        self._workers_count = 1
+        self._stages_workers = None
+        self._started_time = None
+
+    def start(self, workers_count, stages_workers=None):
+        """Starts collection for processing by the given count of workers (or stages workers of pipeline)"""
+        with self._lock:
+            self._histograms = {}
+            self._queue_depths = {}
+            self._images_count = 0
+            self._workers_count = workers_count
+            self._stages_workers = dict(stages_workers) if stages_workers is not None else None
+            self._started_time = time.monotonic()
+            if self._stream_path is not None and self._stream is None:
+                self._stream = open(self._stream_path, "a")
+
+    def record(self, name, seconds):
+        """Adds single timing (e.g. time of a pipeline stage call)"""
+        with self._lock:
+            self._record(name, seconds)
+
+    def record_timings(self, timings, is_image_finished=True):
+        """Adds timings of image processing steps ({name: seconds}), counts image if it is finished"""
+        with self._lock:
+            for name, seconds in timings.items():
+                self._record(name, seconds)
+            if is_image_finished:
+                self._images_count += 1
+                if self._stream is not None:
+                    self._stream.write(json.dumps({"event": "image", "timings": timings}) + "\n")
+
+    def record_queue_depth(self, name, depth):
+        """Adds sample of queue depth (count of images in flight or waiting in queue)"""
+        with self._lock:
+            samples_count, total_depth, max_depth = self._queue_depths[name] if name in self._queue_depths\
+                else (0, 0, 0)
+            self._queue_depths[name] = (samples_count + 1, total_depth + depth, max(max_depth, depth))
+
+    def finish(self):
+        """Finishes collection and returns summary (written to the stream as the last line)"""
+        with self._lock:
+            summary = self._summary()
+            if self._stream is not None:
+                self._stream.write(json.dumps({"event": "summary", "summary": summary}) + "\n")
+                self._stream.close()
+                self._stream = None
+            return summary
+
+    def _record(self, name, seconds):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self._histograms[name] = histogram
+        histogram.record(seconds)
+
+    def _summary(self):
+        duration = time.monotonic() - self._started_time if self._started_time is not None else 0.0
+        latencies = {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+        summary = {
+            "images_count": self._images_count,
+            "duration": duration,
+            "images_per_second": self._images_count / duration if duration > 0 else 0.0,
+            "latencies": latencies,
+            "queue_depths": {
+                name: {"mean": total_depth / samples_count, "max": max_depth}
+                for name, (samples_count, total_depth, max_depth) in sorted(self._queue_depths.items())}
+        }
+
+        # Utilization is busy time of workers divided by time they were available
+        if self._stages_workers is not None:
+            summary["stages_utilization"] = {
+                stage_name: _utilization(latencies, STAGE_METRIC_PREFIX + stage_name, duration, workers_count)
+                for stage_name, workers_count in self._stages_workers.items()}
+        else:
+            summary["workers_utilization"] = _utilization(latencies, IMAGE_METRIC, duration, self._workers_count)
+        return summary
+
+
+def _utilization(latencies, name, duration, workers_count):
+    if name not in latencies or duration <= 0:
+        return 0.0
+    return latencies[name]["total"] / (duration * workers_count)
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Staged pipeline: processing stages with own workers connected by bounded queues"""
+import threading
+import time
+from queue import Queue
+from tvs_metrics import STAGE_METRIC_PREFIX
+
+
+_END_OF_STREAM = object()
+
+
+class StagedPipeline:
+    """Pipeline of stages, every stage passes its results to the next stage queue"""
+    def __init__(self, queue_depth, metrics=None):
+        if queue_depth <= 0:
+            raise ValueError("Queue depth should be positive")
+        self._queue_depth = queue_depth
+        self._metrics = metrics
+        self._stages = []
+        self._errors = []
+        self._is_stopped = threading.Event()
+
+    def add_stage(self, stage_name, stage_function, workers_count):
+        """Adds stage (stage_function returns item for next stage or None to drop it)"""
+        if workers_count <= 0:
+            raise ValueError(f"Workers count of {stage_name} stage should be positive")
+        self._stages.append(_Stage(stage_name, stage_function, workers_count, Queue(self._queue_depth)))
+        return self
+
+    def run(self, items, done_callback=None):
+        """Feeds items to the first stage and waits until all stages are done
+
+        Item is passed to done_callback when the last stage processes it or a stage drops it.
+        """
+        if len(self._stages) == 0:
+            raise ValueError("Pipeline has no stages")
+
+        workers = []
+        for stage_index, stage in enumerate(self._stages):
+            next_stage = self._stages[stage_index + 1] if stage_index + 1 < len(self._stages) else None
+            for _ in range(stage.workers_count):
+                worker = threading.Thread(
+                    target=self._stage_worker, args=(stage, next_stage, done_callback), daemon=True)
+                worker.start()
+                workers.append(worker)
+
+        first_stage = self._stages[0]
+        is_fed = False
+        try:
+            for item in items:
+                if self._is_stopped.is_set():
+                    break
+                first_stage.queue.put((item, item))
+            is_fed = True
+        finally:
+            # Failed source stops the pipeline, workers drain queued items and exit before error is raised
+            if not is_fed:
+                self._is_stopped.set()
+            first_stage.close()
+            for worker in workers:
+                worker.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+    def _stage_worker(self, stage, next_stage, done_callback):
+        while True:
+            item = stage.queue.get()
+            if item is _END_OF_STREAM:
+                if stage.finish_worker() and next_stage is not None:
+                    next_stage.close()
+                return
+
+            # After a failure items are drained without processing, so no stage blocks forever
+            if self._is_stopped.is_set():
+                continue
+
+            # Stage data is passed with the fed item, so processed items are known
+            source_item, stage_data = item
+            try:
+                if self._metrics is not None:
+                    self._metrics.record_queue_depth(stage.name, stage.queue.qsize())
+                    started_time = time.perf_counter()
+                    result = stage.function(stage_data)
+                    self._metrics.record(STAGE_METRIC_PREFIX + stage.name, time.perf_counter() - started_time)
+                else:
+                    result = stage.function(stage_data)
+                if (result is None or next_stage is None) and done_callback is not None:
+                    done_callback(source_item)
+            except Exception as error:
+                self._errors.append(error)
+                self._is_stopped.set()
+                continue
+
+            if result is not None and next_stage is not None:
+                next_stage.queue.put((source_item, result))
+
+
+class _Stage:
+    def __init__(self, name, function, workers_count, queue):
+        self.name = name
+        self.function = function
+        self.workers_count = workers_count
+        self.queue = queue
+        self._active_workers_count = workers_count
+        self._lock = threading.Lock()
+
+    def close(self):
+        for _ in range(self.workers_count):
+            self.queue.put(_END_OF_STREAM)
+
+    def finish_worker(self):
+        with self._lock:
+            self._active_workers_count -= 1
+            return self._active_workers_count == 0
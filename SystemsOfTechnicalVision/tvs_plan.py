@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+"""Execution plan of TVS compiled once from settings"""
+import json
+from collections import namedtuple
+import numpy as np
+from tvs_mappers import FILTER_MAPPING,\
+    DETAILS_EXTRACTION_METHODS,\
+    DETECTION_METHODS,\
+    FILTER_PREPARATION_MAPPING,\
+    DETAILS_EXTRACTION_PREPARATION_METHODS,\
+    DETECTION_PREPARATION_METHODS,\
+    STATEFUL_DETECTION_METHODS
+
+
+# Every step is a (name, function) pair where function is already bound to parsed parameters:
+# filters take image and worker frame buffers (or None), details extraction methods take image,
+# detection methods take image and details
+ExecutionPlan = namedtuple(
+    "ExecutionPlan",
+    ["filters", "details_extraction_methods", "detection_methods"])
+
+
+def compile_plan(filters, details_extraction_methods, detection_methods, is_optimized=False):
+    """Validates settings and compiles them to immutable execution plan
+
+    Optimized plan fuses adjacent filters, so it should be used only when intermediate images are not needed.
+    """
+    if is_optimized:
+        filters = optimize_filters_chain(filters)
+
+    return ExecutionPlan(
+        tuple(
+            _compile_filter_step(filter_object)
+            for filter_object in filters),
+        tuple(
+            _compile_step(
+                method["name"],
+                method["parameters"],
+                DETAILS_EXTRACTION_METHODS,
+                DETAILS_EXTRACTION_PREPARATION_METHODS)
+            for method in details_extraction_methods),
+        tuple(
+            _compile_step(
+                method["name"],
+                method["parameters"],
+                DETECTION_METHODS,
+                DETECTION_PREPARATION_METHODS)
+            for method in detection_methods))
+
+
+def is_stateful_plan(plan):
+    """Checks that results of plan depend on previous frames (so they can not be reused for the same image)"""
+    return any(method_name in STATEFUL_DETECTION_METHODS for method_name, _ in plan.detection_methods)
+
+
+class FiltersTreeNode:
+    """Filter step shared by filters chains with equal prefix (root node has no filter)"""
+    def __init__(self, filter_name=None, filter_function=None):
+        self.filter_name = filter_name
+        self.filter_function = filter_function
+        self.children = {}
+        self.chains_indices = []
+
+
+def compile_filters_tree(filters_chains, is_optimized=False):
+    """Compiles several filters chains to prefix tree, so equal prefix of chains is applied once
+
+    Indices of chains are stored in nodes where chains end.
+    """
+    root = FiltersTreeNode()
+    for chain_index, filters in enumerate(filters_chains):
+        if is_optimized:
+            filters = optimize_filters_chain(filters)
+
+        node = root
+        for filter_object in filters:
+            filter_key = (
+                filter_object["filter_name"],
+                json.dumps(filter_object["filter_parameters"], sort_keys=True))
+            if filter_key not in node.children:
+                node.children[filter_key] = FiltersTreeNode(*_compile_filter_step(filter_object))
+            node = node.children[filter_key]
+        node.chains_indices.append(chain_index)
+    return root
+
+
+def optimize_filters_chain(filters):
+    """Fuses adjacent filters which are equal to a single filter with merged parameters"""
+    optimized_filters = []
+    for filter_object in filters:
+        fused_filter = _fuse_filters(optimized_filters[-1], filter_object) if optimized_filters else None
+        if fused_filter is not None:
+            optimized_filters[-1] = fused_filter
+        else:
+            optimized_filters.append(filter_object)
+    return optimized_filters
+
+
+def _fuse_filters(first_filter, second_filter):
+    filter_name = first_filter["filter_name"]
+    if filter_name != second_filter["filter_name"] or filter_name not in _FILTERS_FUSION_MAPPING:
+        return None
+
+    fused_parameters = _FILTERS_FUSION_MAPPING[filter_name](
+        first_filter["filter_parameters"], second_filter["filter_parameters"])
+    if fused_parameters is None:
+        return None
+
+    return {"filter_name": filter_name, "filter_parameters": fused_parameters}
+
+
+def _fuse_morphology_iterations(first_parameters, second_parameters):
+    # Dilate/erode with default 3x3 kernel N times is a single pass with (2N+1)x(2N+1) kernel
+    key = "iterations_count"
+    if key not in first_parameters or key not in second_parameters:
+        return None
+    return {key: first_parameters[key] + second_parameters[key]}
+
+
+def _fuse_binarizations(first_parameters, second_parameters):
+    # First binarization gives only 0 and its upper threshold, so second one either
+    # keeps white pixels with own upper value or makes the whole image black
+    keys = ("lower_threshold", "upper_threshold")
+    if any(key not in first_parameters or key not in second_parameters for key in keys):
+        return None
+
+    first_lower, first_upper = first_parameters["lower_threshold"], first_parameters["upper_threshold"]
+    second_lower, second_upper = second_parameters["lower_threshold"], second_parameters["upper_threshold"]
+
+    if first_upper <= second_lower:
+        return {"lower_threshold": 255, "upper_threshold": 255}
+    if first_lower > second_upper:
+        return None
+    return {"lower_threshold": first_lower, "upper_threshold": second_upper}
+
+
+_FILTERS_FUSION_MAPPING = {
+    "cv2_dilate_filter": _fuse_morphology_iterations,
+    "cv2_erode_filter": _fuse_morphology_iterations,
+    "cv2_binarization_filter": _fuse_binarizations
+}
+
+
+def _same_frame_format(image):
+    return image.shape, image.dtype
+
+
+def _single_channel_frame_format(image):
+    return image.shape[:2], image.dtype
+
+
+def _mask_frame_format(image):
+    return image.shape[:2], np.dtype(np.uint8)
+
+
+def _absolute_values_frame_format(image):
+    return image.shape, np.dtype(np.uint8)
+
+
+# Filters which write result to destination buffer: (result frame format, is in-place application allowed)
+_BUFFERED_FILTERS = {
+    "cv2_gray_filter": (_single_channel_frame_format, False),
+    "cv2_hsv_filter": (_same_frame_format, False),
+    "cv2_hsv_color_range_filter": (_mask_frame_format, False),
+    "cv2_sobel_filter": (_absolute_values_frame_format, True),
+    "cv2_binarization_filter": (_same_frame_format, True),
+    "cv2_blur_filter": (_same_frame_format, True),
+    "cv2_dilate_filter": (_same_frame_format, True),
+    "cv2_erode_filter": (_same_frame_format, True),
+    "cv2_morphology_close_filter": (_same_frame_format, True)
+}
+
+
+def _compile_filter_step(filter_object):
+    filter_name, filter_function = _compile_step(
+        filter_object["filter_name"],
+        filter_object["filter_parameters"],
+        FILTER_MAPPING,
+        FILTER_PREPARATION_MAPPING)
+
+    if filter_name in _BUFFERED_FILTERS:
+        frame_format, is_in_place = _BUFFERED_FILTERS[filter_name]
+        return filter_name, _buffered(filter_function, frame_format, is_in_place)
+    return filter_name, _unbuffered(filter_function)
+
+
+def _buffered(filter_function, frame_format, is_in_place):
+    def _apply_filter(image, buffers):
+        if buffers is None:
+            return filter_function(image)
+        shape, dtype = frame_format(image)
+        return filter_function(image, dst=buffers.destination(shape, dtype, image, is_in_place))
+
+    return _apply_filter
+
+
+def _unbuffered(filter_function):
+    return lambda image, buffers: filter_function(image)
+
+
+def _compile_step(name, parameters, methods_mapping, preparation_mapping):
+    if name not in methods_mapping:
+        raise ValueError(f"Unknown filter or method: {name}")
+
+    if name in preparation_mapping:
+        return name, preparation_mapping[name](parameters)
+
+    return name, _bind_parameters(methods_mapping[name], parameters)
+
+
+def _bind_parameters(method, parameters):
+    return lambda *image_data: method(*image_data, parameters)
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""Sampling profiling of TVS processing by cProfile, profiles of all workers are merged to one dump"""
+import cProfile
+import glob
+import itertools
+import os
+import pstats
+import threading
+import uuid
+
+
+DEFAULT_SAMPLE_INTERVAL = 10
+
+
+class SamplingProfiler:
+    """Profiles every sample_interval-th call by cProfile, other calls run without profiler
+
+    Only one call of a process is profiled at a time (cProfile of Python 3.12+ profiles all threads),
+    so sampled calls of other threads are not profiled while a call is profiled.
+    """
+    def __init__(self, dump_path, sample_interval=DEFAULT_SAMPLE_INTERVAL, run_id=None):
+        if sample_interval <= 0:
+            raise ValueError("Sample interval of profiling should be positive")
+        self._dump_path = dump_path
+        self._sample_interval = sample_interval
+        self._run_id = run_id if run_id is not None else uuid.uuid4().hex
+        self._calls_counter = itertools.count()
+        self._profile_lock = threading.Lock()
+        self._profile = cProfile.Profile()
+        self._samples_count = 0
+
+    @property
+    def settings(self):
+        """Settings of profilers of worker processes which write parts of the same dump"""
+        return self._dump_path, self._sample_interval, self._run_id
+
+    def call(self, function, *args):
+        """Calls function, the call is profiled if it is sampled"""
+        if next(self._calls_counter) % self._sample_interval != 0\
+                or not self._profile_lock.acquire(blocking=False):
+            return function(*args)
+
+        try:
+            self._samples_count += 1
+            self._profile.enable()
+            try:
+                return function(*args)
+            finally:
+                self._profile.disable()
+        finally:
+            self._profile_lock.release()
+
+    def dump_part(self):
+        """Writes samples of worker process to a part of dump, profile is reset for the next samples"""
+        with self._profile_lock:
+            if self._samples_count == 0:
+                return
+            self._profile.dump_stats(f"{self._dump_path}.{self._run_id}.{os.getpid()}.part")
+            self._profile = cProfile.Profile()
+            self._samples_count = 0
+
+    def dump(self):
+        """Merges samples of this process and parts of worker processes to dump, returns False if it is empty"""
+        with self._profile_lock:
+            stats = pstats.Stats(self._profile) if self._samples_count > 0 else None
+            for part_path in sorted(glob.glob(f"{glob.escape(self._dump_path)}.{self._run_id}.*.part")):
+                if stats is None:
+                    stats = pstats.Stats(part_path)
+                else:
+                    stats.add(part_path)
+                os.remove(part_path)
+
+            if stats is None:
+                return False
+            stats.dump_stats(self._dump_path)
+            return True
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Bounded scheduling of images processing on a workers pool"""
+import functools
+import threading
+
+
+def run_bounded(
+        pool, function, items, queue_depth,
+        result_callback=None, queue_depth_callback=None, done_callback=None):
+    """Applies function to items on the pool keeping at most queue_depth items in flight
+
+    Results are passed to result_callback, count of items in flight is passed to
+    queue_depth_callback when an item is submitted, processed items are passed to done_callback.
+    """
+    if queue_depth <= 0:
+        raise ValueError("Queue depth should be positive")
+
+    free_slots = threading.BoundedSemaphore(queue_depth)
+    errors = []
+    in_flight_count = [0]
+    in_flight_lock = threading.Lock()
+
+    def _on_done(item, result):
+        # Error of callback is raised by the scheduling thread, result handler of the pool keeps working
+        try:
+            if result_callback is not None:
+                result_callback(result)
+            if done_callback is not None:
+                done_callback(item)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            with in_flight_lock:
+                in_flight_count[0] -= 1
+            free_slots.release()
+
+    def _on_error(error):
+        errors.append(error)
+        with in_flight_lock:
+            in_flight_count[0] -= 1
+        free_slots.release()
+
+    # Next item is taken from the generator only when a worker frees a slot,
+    # so reading of sources is throttled by the processing speed
+    items_iterator = iter(items)
+    while True:
+        free_slots.acquire()
+        if errors:
+            free_slots.release()
+            break
+        try:
+            item = next(items_iterator)
+        except StopIteration:
+            free_slots.release()
+            break
+        with in_flight_lock:
+            in_flight_count[0] += 1
+            if queue_depth_callback is not None:
+                queue_depth_callback(in_flight_count[0])
+        pool.apply_async(
+            function, (item,), callback=functools.partial(_on_done, item), error_callback=_on_error)
+
+    for _ in range(queue_depth):
+        free_slots.acquire()
+
+    if errors:
+        raise errors[0]
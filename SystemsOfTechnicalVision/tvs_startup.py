@@ -2,9 +2,23 @@
 """System of technical vision startup module"""
 import argparse
 import json
+import os
+import sys
+from tvs_executors import WorkerPool, PROCESS_EXECUTOR
+from detection.cascade_registry import evict_cascades
 from tvs_builder import TechnicalVisionSystemBuilder
-from high_level_processing.preprocessing import clean_output_directory
-from high_level_processing.smiles_hl_processing import smiles_hl_processing
+from tvs_daemon import serve_spool_directory, serve_unix_socket
+from tvs_tiles import DEFAULT_STRIP_HEIGHT, DEFAULT_MIN_IMAGE_PIXELS
+from tvs_mappers import HIGH_LEVEL_PROCESSING_FUNCTIONS, PREPROCESSING_FUNCTIONS
+from tvs_profiling import DEFAULT_SAMPLE_INTERVAL
+from tvs_batches import DEFAULT_MAX_BATCHED_FRAME_PIXELS
+
+
+DEFAULT_HIGH_LEVEL_PROCESSING_FUNCTION = "smiles_hl_processing"
+DEFAULT_PREPROCESSING_FUNCTION = "clean_output_directory"
+
+# Modification times of loaded settings files by absolute paths
+_settings_modification_times = {}
 
 
 def _parse_arguments():
@@ -15,35 +29,265 @@ def _parse_arguments():
         "-s",
         "--settings",
         type=str,
-        default="settings.json",
-        help="JSON file with settings")
+        nargs="+",
+        default=["settings.json"],
+        help="JSON files with settings (images are read once and processed with all of them, "
+             "sources and common settings are taken from the first file)")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=str,
+        help="File with settings files of one job per line ('-' for standard input), "
+             "jobs are processed one by one by the same process")
+    parser.add_argument(
+        "--spool",
+        type=str,
+        help="Run as daemon which processes JSON jobs ({\"settings\": [...], \"sources\": [...]}) "
+             "from '*.job' files of the directory")
+    parser.add_argument(
+        "--socket",
+        type=str,
+        help="Run as daemon which processes JSON jobs received over the UNIX socket")
+    parser.add_argument(
+        "--pool-executor",
+        type=str,
+        default=PROCESS_EXECUTOR,
+        help="Executor of warm workers of the daemon (thread or process)")
+    parser.add_argument(
+        "--pool-workers",
+        type=int,
+        help="Count of warm workers of the daemon (CPU count by default)")
+    parser.add_argument(
+        "--profile",
+        type=str,
+        help="File of cProfile dump merged from sampled images of all workers "
+             "(job number is appended to the file name of every job)")
+    parser.add_argument(
+        "--profile-interval",
+        type=int,
+        default=DEFAULT_SAMPLE_INTERVAL,
+        help="Every N-th image of every worker is profiled")
     parser.add_argument("-v", "--version", action="version", version="%(prog)s 0.5")
 
     return parser.parse_args()
 
 
+def _get_setting(settings, key, default_value):
+    return settings[key] if key in settings else default_value
+
+
+def load_settings(settings_path, base_directory_path=None):
+    """Loads JSON settings with Windows separators of paths replaced (relative paths are based on the directory)
+
+    Loaded cascades are evicted if the file was changed after its previous loading.
+    """
+    _evict_cascades_if_changed(settings_path)
+    with open(settings_path) as json_file:
+        return _normalize_paths(json.load(json_file), None, base_directory_path)
+
+
+def _evict_cascades_if_changed(settings_path):
+    # Jobs and daemon load settings files again, so cascades named by changed settings are reloaded
+    modification_time = os.path.getmtime(settings_path)
+    previous_modification_time = _settings_modification_times.get(os.path.abspath(settings_path))
+    _settings_modification_times[os.path.abspath(settings_path)] = modification_time
+    if previous_modification_time is not None and previous_modification_time != modification_time:
+        evict_cascades()
+
+
+def _normalize_paths(value, key, base_directory_path):
+    # Paths are values of "*_path" keys and sources, URIs of video streams are kept as is
+    if isinstance(value, dict):
+        return {
+            item_key: _normalize_paths(item, item_key, base_directory_path) for item_key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize_paths(item, key, base_directory_path) for item in value]
+    if not isinstance(value, str) or key is None or "://" in value\
+            or not (key.endswith("_path") or key == "sources"):
+        return value
+
+    path = value.replace("\\", os.sep) if os.sep != "\\" else value
+    if base_directory_path is not None and not os.path.isabs(path):
+        path = os.path.join(base_directory_path, path)
+    return path
+
+
+def _get_mapped_function(mapping, name, description):
+    if name not in mapping:
+        raise ValueError(f"Unknown {description} function: {name}")
+    return mapping[name]
+
+
+def _create_task_builder(settings):
+    high_level_processing_settings = _get_setting(settings, "high_level_processing", {})
+    high_level_processing_function = _get_mapped_function(
+        HIGH_LEVEL_PROCESSING_FUNCTIONS,
+        _get_setting(high_level_processing_settings, "function", DEFAULT_HIGH_LEVEL_PROCESSING_FUNCTION),
+        "high-level processing")
+
+    technical_vision_system_builder = TechnicalVisionSystemBuilder()\
+        .with_filters(settings["preprocessing"]["filters_chain"])\
+        .with_details_extraction_methods(settings["details_extraction"]["methods"])\
+        .with_detection_methods(settings["detection_and_segmentation"]["methods"])\
+        .result_processed_by(high_level_processing_function)
+
+    if settings["common_settings"]["is_intermediate_results_saves"]:
+        technical_vision_system_builder.save_intermediate_results()
+    return technical_vision_system_builder
+
+
+def _create_system(settings_paths, sources=None, worker_pool=None):
+    settings_list = [load_settings(settings_path) for settings_path in settings_paths]
+    return create_system(settings_list, sources, worker_pool)
+
+
+def create_system(settings_list, sources=None, worker_pool=None):
+    """Creates vision system from loaded settings, systems of other settings are joint to the first one"""
+    settings = settings_list[0]
+    high_level_processing_settings = _get_setting(settings, "high_level_processing", {})
+    preprocessing_function_name = _get_setting(
+        high_level_processing_settings, "preprocessing", DEFAULT_PREPROCESSING_FUNCTION)
+
+    technical_vision_system_builder = _create_task_builder(settings)\
+        .from_sources(sources if sources is not None else settings["image_acquisition"]["sources"])
+
+    if preprocessing_function_name is not None:
+        technical_vision_system_builder.with_preprocessing(
+            _get_mapped_function(PREPROCESSING_FUNCTIONS, preprocessing_function_name, "preprocessing"))
+
+    for joint_settings in settings_list[1:]:
+        technical_vision_system_builder.with_joint_system(_create_task_builder(joint_settings).build())
+
+    image_acquisition_settings = settings["image_acquisition"]
+    technical_vision_system_builder.with_sources_scanning(
+        _get_setting(image_acquisition_settings, "is_recursive", False),
+        _get_setting(image_acquisition_settings, "extensions", None),
+        _get_setting(image_acquisition_settings, "patterns", None),
+        _get_setting(image_acquisition_settings, "min_file_size", 0))
+
+    if "cursor_path" in image_acquisition_settings:
+        technical_vision_system_builder.resuming_from_cursor(image_acquisition_settings["cursor_path"])
+
+    technical_vision_system_builder.with_video_frames_reading(
+        _get_setting(image_acquisition_settings, "frame_stride", 1),
+        _get_setting(image_acquisition_settings, "frames_buffer_size", None),
+        _get_setting(image_acquisition_settings, "is_dropping_oldest_frames", False))
+
+    if "decode_mode" in image_acquisition_settings:
+        technical_vision_system_builder.with_decode_mode(image_acquisition_settings["decode_mode"])
+
+    if "prefetch_threads_count" in image_acquisition_settings:
+        technical_vision_system_builder.with_prefetching(
+            image_acquisition_settings["prefetch_threads_count"],
+            _get_setting(image_acquisition_settings, "read_ahead_count", None))
+
+    common_settings = settings["common_settings"]
+    if "executor" in common_settings:
+        technical_vision_system_builder.with_executor(common_settings["executor"])
+    elif common_settings["is_parallel_processing"]:
+        technical_vision_system_builder.in_parallel()
+
+    if "workers_count" in common_settings:
+        technical_vision_system_builder.with_workers_count(common_settings["workers_count"])
+
+    if "pipeline_stages" in common_settings:
+        technical_vision_system_builder.with_pipeline_stages_workers(common_settings["pipeline_stages"])
+
+    if "queue_depth" in common_settings:
+        technical_vision_system_builder.with_queue_depth(common_settings["queue_depth"])
+
+    if "result_writer" in common_settings:
+        technical_vision_system_builder.with_result_writer(common_settings["result_writer"])
+
+    if "result_cache" in common_settings:
+        result_cache_settings = common_settings["result_cache"]
+        technical_vision_system_builder.with_result_cache(
+            result_cache_settings["directory_path"],
+            _get_setting(result_cache_settings, "max_size_mb", 1024))
+
+    if "tiling" in common_settings:
+        tiling_settings = common_settings["tiling"]
+        technical_vision_system_builder.with_tiling(
+            _get_setting(tiling_settings, "strip_height", DEFAULT_STRIP_HEIGHT),
+            _get_setting(tiling_settings, "threads_count", None),
+            _get_setting(tiling_settings, "min_image_pixels", DEFAULT_MIN_IMAGE_PIXELS))
+
+    if "batching" in common_settings:
+        batching_settings = common_settings["batching"]
+        technical_vision_system_builder.with_batching(
+            batching_settings["batch_size"],
+            _get_setting(batching_settings, "max_frame_pixels", DEFAULT_MAX_BATCHED_FRAME_PIXELS))
+
+    if "metrics" in common_settings:
+        technical_vision_system_builder.with_metrics(
+            _get_setting(common_settings["metrics"], "stream_path", None))
+
+    if worker_pool is not None:
+        technical_vision_system_builder.on_worker_pool(worker_pool)
+
+    return technical_vision_system_builder.build()
+
+
+def _print_metrics(metrics_summary):
+    # Summary is returned only if metrics are enabled in common settings
+    if metrics_summary is not None:
+        print(json.dumps({"metrics": metrics_summary}, indent=4))
+
+
+def _read_jobs(jobs_file):
+    for line in jobs_file:
+        settings_paths = line.split()
+        if settings_paths and not settings_paths[0].startswith("#"):
+            yield settings_paths
+
+
+def _run_jobs(jobs_file, args):
+    # Imported modules, loaded cascades and compiled settings stay warm between jobs
+    failed_jobs_count = 0
+    for job_number, settings_paths in enumerate(_read_jobs(jobs_file)):
+        try:
+            technical_vision_system = _create_system(settings_paths)
+            if args.profile is not None:
+                technical_vision_system.set_profiling(f"{args.profile}.{job_number}", args.profile_interval)
+            _print_metrics(technical_vision_system.start_processing())
+        except Exception as error:
+            failed_jobs_count += 1
+            print(f"Job {' '.join(settings_paths)} failed: {error}", file=sys.stderr)
+    return 1 if failed_jobs_count > 0 else 0
+
+
+def _run_daemon(args):
+    with WorkerPool(args.pool_executor, args.pool_workers) as worker_pool:
+        def _run_job(job):
+            sources = job["sources"] if "sources" in job else None
+            _print_metrics(_create_system(job["settings"], sources, worker_pool).start_processing())
+
+        try:
+            if args.socket is not None:
+                serve_unix_socket(args.socket, _run_job)
+            else:
+                serve_spool_directory(args.spool, _run_job)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
 def main():
     """System of technical vision startup file"""
     args = _parse_arguments()
-    with open(args.settings) as json_file:
-        settings = json.load(json_file)
-        technical_vision_system_builder = TechnicalVisionSystemBuilder()\
-            .from_sources(settings["image_acquisition"]["sources"])\
-            .with_preprocessing(clean_output_directory)\
-            .with_filters(settings["preprocessing"]["filters_chain"])\
-            .with_details_extraction_methods(settings["details_extraction"]["methods"])\
-            .with_detection_methods(settings["detection_and_segmentation"]["methods"])\
-            .result_processed_by(smiles_hl_processing)
-
-        if settings["common_settings"]["is_parallel_processing"]:
-            technical_vision_system_builder.in_parallel()
-
-        if settings["common_settings"]["is_intermediate_results_saves"]:
-            technical_vision_system_builder.save_intermediate_results()
+    if args.spool is not None or args.socket is not None:
+        return _run_daemon(args)
+    if args.jobs == "-":
+        return _run_jobs(sys.stdin, args)
+    if args.jobs is not None:
+        with open(args.jobs) as jobs_file:
+            return _run_jobs(jobs_file, args)
 
-        technical_vision_system = technical_vision_system_builder.build()
-        technical_vision_system.start_processing()
+    technical_vision_system = _create_system(args.settings)
+    technical_vision_system.set_profiling(args.profile, args.profile_interval)
+    _print_metrics(technical_vision_system.start_processing())
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
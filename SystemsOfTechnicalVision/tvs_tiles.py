@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""Parallel application of filters chain to overlapping horizontal strips of large images"""
+import multiprocessing
+import os
+import threading
+from multiprocessing.dummy import Pool as ThreadPool
+import numpy as np
+from tvs_buffers import get_worker_buffers
+
+
+DEFAULT_STRIP_HEIGHT = 1024
+DEFAULT_MIN_IMAGE_PIXELS = 4096 * 4096
+
+# Pools of strips threads by threads count, shared by all executors of the process
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def filters_chain_halo(filters):
+    """Returns count of rows around every result row which are read by filters chain (None if it is unknown)"""
+    halo = 0
+    for filter_object in filters:
+        filter_name = filter_object["filter_name"]
+        if filter_name not in _FILTERS_HALO:
+            return None
+        halo += _FILTERS_HALO[filter_name](filter_object["filter_parameters"])
+    return halo
+
+
+class StripsExecutor:
+    """Applies filters chain to overlapping strips of large image in parallel threads
+
+    Every strip is extended by halo rows, so stitched result is equal to the result of the whole image.
+    """
+    def __init__(
+            self, strip_height=DEFAULT_STRIP_HEIGHT, threads_count=None, min_image_pixels=DEFAULT_MIN_IMAGE_PIXELS):
+        if strip_height <= 0:
+            raise ValueError("Strip height should be positive")
+        if threads_count is not None and threads_count <= 0:
+            raise ValueError("Threads count of strips processing should be positive")
+        self._strip_height = strip_height
+        self._threads_count = threads_count if threads_count is not None else multiprocessing.cpu_count()
+        self._min_image_pixels = min_image_pixels
+
+    def is_applicable(self, image):
+        """Checks that image is large enough to be processed by strips"""
+        height, width = image.shape[:2]
+        return height > self._strip_height and height * width >= self._min_image_pixels
+
+    def apply(self, filters, halo, image):
+        """Applies compiled filters to strips of image, returns new image with stitched result"""
+        height = image.shape[0]
+        strips = [(top, min(top + self._strip_height, height)) for top in range(0, height, self._strip_height)]
+
+        # Format of result is known only after filtering, so the first strip is filtered before others
+        first_strip_result = _filter_strip(filters, halo, image, strips[0])
+        result = np.empty((height,) + first_strip_result.shape[1:], first_strip_result.dtype)
+        result[:strips[0][1]] = first_strip_result
+
+        def _filter_strip_to_result(strip):
+            top, bottom = strip
+            result[top:bottom] = _filter_strip(filters, halo, image, strip)
+
+        _get_pool(self._threads_count).map(_filter_strip_to_result, strips[1:], chunksize=1)
+        return result
+
+
+def _get_pool(threads_count):
+    # Threads are started by the first large image (in worker process for process executor),
+    # executors of every compiled system use the same pool, so jobs do not leave threads behind
+    with _pools_lock:
+        if threads_count not in _pools:
+            _pools[threads_count] = ThreadPool(threads_count)
+        return _pools[threads_count]
+
+
+def _drop_pools_after_fork():
+    # Threads of parent pools do not exist in forked worker process
+    global _pools, _pools_lock
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+
+def _filter_strip(filters, halo, image, strip):
+    top, bottom = strip
+    halo_top = max(top - halo, 0)
+    filtered_strip = image[halo_top:min(bottom + halo, image.shape[0])]
+    buffers = get_worker_buffers()
+    for _, filter_function in filters:
+        filtered_strip = filter_function(filtered_strip, buffers)
+    return filtered_strip[top - halo_top:bottom - halo_top]
+
+
+def _no_halo(filter_parameters):
+    return 0
+
+
+def _blur_halo(filter_parameters):
+    # Anchor of kernel is in its center, so even kernel reads one row less below
+    return filter_parameters["radius"] // 2
+
+
+def _morphology_iterations_halo(filter_parameters):
+    # Default 3x3 kernel reads one row around for every iteration
+    return filter_parameters["iterations_count"]
+
+
+def _morphology_close_halo(filter_parameters):
+    # Closing is dilation followed by erosion with the same kernel
+    return 2 * (filter_parameters["kernel_rectangle_height"] // 2)
+
+
+def _sobel_halo(filter_parameters):
+    return 1
+
+
+_FILTERS_HALO = {
+    "cv2_gray_filter": _no_halo,
+    "cv2_hsv_filter": _no_halo,
+    "cv2_hsv_color_range_filter": _no_halo,
+    "cv2_binarization_filter": _no_halo,
+    "cv2_blur_filter": _blur_halo,
+    "cv2_dilate_filter": _morphology_iterations_halo,
+    "cv2_erode_filter": _morphology_iterations_halo,
+    "cv2_morphology_close_filter": _morphology_close_halo,
+    "cv2_sobel_filter": _sobel_halo
+}
+
+
+os.register_at_fork(after_in_child=_drop_pools_after_fork)